@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Async API - asyncio entry points for search and design system generation.
+
+Index builds, scoring and file writes run in an executor (the loop's default
+thread pool unless one is passed), so the event loop is never blocked.
+
+Usage:
+    from async_api import async_search, async_search_many, async_generate_design_system
+
+    result = await async_search("glassmorphism", "style", timeout=5)
+    results = await async_search_many(["saas", "fintech", "spa"], limit=4)
+    output = await async_generate_design_system("SaaS dashboard", "My Project", persist=True)
+
+Cancellation and timeouts apply to the awaiting coroutine: a cancelled or
+timed-out call raises CancelledError / TimeoutError immediately, while work
+already running in a worker thread finishes in the background and is discarded.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from core import MAX_RESULTS, search, search_stack
+from design_system import get_generator, persist_design_system
+
+
+# ============ HELPERS ============
+async def _offload(func, *args, timeout: float = None, executor: Executor = None):
+    """Run a blocking call in the executor, optionally bounded by a timeout."""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, functools.partial(func, *args))
+    if timeout is None:
+        return await future
+    return await asyncio.wait_for(future, timeout)
+
+
+# ============ ASYNC API ============
+async def async_search(query: str, domain: str = None, max_results: int = MAX_RESULTS,
+                       *, timeout: float = None, executor: Executor = None) -> dict:
+    """Async core.search()."""
+    return await _offload(search, query, domain, max_results, timeout=timeout, executor=executor)
+
+
+async def async_search_stack(query: str, stack: str, max_results: int = MAX_RESULTS,
+                             *, timeout: float = None, executor: Executor = None) -> dict:
+    """Async core.search_stack()."""
+    return await _offload(search_stack, query, stack, max_results, timeout=timeout, executor=executor)
+
+
+async def async_search_many(queries: list, domain: str = None, max_results: int = MAX_RESULTS,
+                            *, limit: int = 8, timeout: float = None, executor: Executor = None) -> list:
+    """Run async_search() for many queries concurrently, at most `limit` at a time.
+
+    Results keep the order of queries. A query that fails or times out
+    yields {"error": ..., "query": ...} instead of aborting the others.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(query):
+        async with semaphore:
+            try:
+                return await async_search(query, domain, max_results, timeout=timeout, executor=executor)
+            except asyncio.TimeoutError:
+                return {"error": f"Timed out after {timeout}s", "query": query}
+            except Exception as e:
+                return {"error": f"{type(e).__name__}: {e}", "query": query}
+
+    return await asyncio.gather(*(run(query) for query in queries))
+
+
+async def async_generate_design_system(query: str, project_name: str = None, output_format: str = "ascii",
+                                       persist: bool = False, page: str = None, output_dir: str = None,
+                                       *, timeout: float = None, executor: Executor = None) -> str:
+    """Async generate_design_system(); generation and persistence both run off the loop.
+
+    timeout bounds the whole call (generation plus persistence).
+    """
+    async def run():
+        generator = await _offload(get_generator, executor=executor)  # First call loads ui-reasoning.csv
+        if persist:
+            design_system = await _offload(generator.generate, query, project_name, executor=executor)
+            await _offload(persist_design_system, design_system, page, output_dir, query, executor=executor)
+        render_format = "markdown" if output_format == "markdown" else "ascii"
+        return await _offload(generator.render, query, project_name, render_format, executor=executor)
+
+    if timeout is None:
+        return await run()
+    return await asyncio.wait_for(run(), timeout)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Benchmark - reproducible latency, throughput and memory numbers
+for the search engine and design system generator.
+
+Usage: python benchmark.py [--repeat 20] [--scales 10,100,1000] [--output results.json]
+       python benchmark.py --compare baseline.json [--threshold 1.25]
+       python benchmark.py --startup [--startup-budget 150]
+
+Measures, over a fixed query set:
+  fit/<domain>, score/<domain>   BM25.fit / BM25.score on each domain CSV
+  fit/x<N>, score/x<N>           the same on a synthetic corpus of N copies of ux-guidelines.csv
+  search/<domain>, stack/<stack> core.search / core.search_stack
+  generate, format/<name>        DesignSystemGenerator.generate and each output formatter
+  startup/<name>                 wall time of a fresh `python search.py ...` process (STARTUP_COMMANDS)
+
+Result caches are disabled so every call does the full work. Each benchmark
+reports p50/p95/p99/mean latency, calls per second and the peak traced
+memory of one pass. --compare exits with status 1 when any p50 latency
+regressed by more than --threshold times the baseline; --startup-budget
+exits with status 1 when any startup/* p50 takes longer than that many ms.
+"""
+
+import argparse
+import csv
+import json
+import platform
+import importlib.util
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+import core
+from core import AVAILABLE_STACKS, BM25, CSV_CONFIG, DATA_DIR, MAX_RESULTS, search, search_stack
+from design_system import (DesignSystemGenerator, format_ascii_box, format_markdown, format_master_md,
+                           format_page_override_md)
+
+
+# ============ CONFIGURATION ============
+QUERIES = [
+    "saas dashboard", "fintech crypto landing", "glassmorphism dark mode", "animation accessibility",
+    "elegant luxury serif", "responsive form validation", "beauty spa wellness service", "ecommerce checkout",
+    "healthcare app", "real-time chart trend", "minimal clean portfolio", "gaming neon playful"
+]
+DESIGN_SYSTEM_QUERIES = QUERIES[:6]
+DEFAULT_REPEAT = 20
+DEFAULT_SCALES = (10, 100, 1000)
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None  # core imports it lazily
+SCALE_SOURCE = "ux"  # Domain whose CSV is replicated for the synthetic corpora
+SEED = 1234
+STARTUP_COMMANDS = {
+    "search": ["search.py", "saas dashboard"],
+    "design_system": ["search.py", "saas dashboard", "--design-system"]
+}
+
+
+# ============ MEASUREMENT ============
+def _percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _measure(func, calls: list, repeat: int, traced: bool = True) -> dict:
+    """Time func(*args) for every args in calls, repeat times, after one warm-up call.
+
+    traced=False skips the tracemalloc pass (peak_kib is then 0).
+    """
+    func(*calls[0])
+    samples = []
+    for _ in range(repeat):
+        for args in calls:
+            start = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - start)
+
+    # Separate traced pass: tracemalloc slows allocation-heavy code down
+    peak = 0
+    if traced:
+        tracemalloc.start()
+        try:
+            for args in calls:
+                func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    samples.sort()
+    total = sum(samples)
+    return {
+        "n": len(samples),
+        "p50_ms": _percentile(samples, 50) * 1000,
+        "p95_ms": _percentile(samples, 95) * 1000,
+        "p99_ms": _percentile(samples, 99) * 1000,
+        "mean_ms": total / len(samples) * 1000,
+        "ops_per_sec": len(samples) / total if total else 0.0,
+        "peak_kib": peak / 1024
+    }
+
+
+def _documents(domain: str) -> list:
+    """Search documents of a domain CSV, built the way the index builds them."""
+    config = CSV_CONFIG[domain]
+    with open(DATA_DIR / config["file"], 'r', encoding='utf-8') as f:
+        return [tuple(str(row.get(col, "")) for col in config["search_cols"]) for row in csv.DictReader(f)]
+
+
+def _scaled_documents(documents: list, scale: int) -> list:
+    """scale copies of documents, each copy with its own variant terms so the vocabulary grows too."""
+    rng = random.Random(SEED)
+    scaled = []
+    for copy in range(scale):
+        for doc in documents:
+            scaled.append((*doc[:-1], f"{doc[-1]} variant{copy} term{rng.randrange(scale * 10)}"))
+    return scaled
+
+
+def _run_script(argv: list):
+    """Run a script of this directory in a fresh interpreter, discarding its output."""
+    subprocess.run([sys.executable, *argv], cwd=Path(__file__).parent, stdout=subprocess.DEVNULL, check=True)
+
+
+def _fitted(documents: list) -> BM25:
+    """A BM25 fitted on documents."""
+    bm25 = BM25()
+    bm25.fit(documents)
+    return bm25
+
+
+# ============ BENCHMARKS ============
+def run_startup(repeat: int = DEFAULT_REPEAT, log=None) -> dict:
+    """Time cold CLI starts of STARTUP_COMMANDS and return {name: stats}."""
+    results = {}
+    for name, argv in STARTUP_COMMANDS.items():
+        results[f"startup/{name}"] = _measure(_run_script, [(argv,)], repeat, traced=False)
+        if log:
+            log(_format_row(f"startup/{name}", results[f"startup/{name}"]))
+    return results
+
+
+def run_benchmarks(repeat: int = DEFAULT_REPEAT, scales=DEFAULT_SCALES, log=None, startup: bool = True) -> dict:
+    """Run every benchmark and return {"meta": {...}, "benchmarks": {name: stats}}.
+
+    startup=False skips the subprocess start-up timings.
+    """
+    results = {}
+
+    def record(name, func, calls, times=repeat, **extra):
+        results[name] = {**_measure(func, calls, times), **extra}
+        if log:
+            log(_format_row(name, results[name]))
+
+    if startup:
+        results.update(run_startup(repeat, log))
+
+    query_calls = [(query,) for query in QUERIES]
+    saved_cache_size = core.query_cache.maxsize
+    core.query_cache.maxsize = 0
+    core.query_cache.clear()
+    try:
+        for domain in CSV_CONFIG:
+            if not (DATA_DIR / CSV_CONFIG[domain]["file"]).exists():
+                continue
+            documents = _documents(domain)
+            record(f"fit/{domain}", _fitted, [(documents,)], docs=len(documents))
+            bm25 = _fitted(documents)
+            record(f"score/{domain}", lambda query: bm25.score(query, MAX_RESULTS), query_calls, docs=len(documents))
+
+        base = _documents(SCALE_SOURCE)
+        for scale in scales:
+            documents = _scaled_documents(base, scale)
+            # Large corpora get fewer fit runs so the suite stays tractable
+            record(f"fit/x{scale}", _fitted, [(documents,)], max(3, repeat // scale),
+                   docs=len(documents))
+            bm25 = _fitted(documents)
+            record(f"score/x{scale}", lambda query: bm25.score(query, MAX_RESULTS), query_calls,
+                   docs=len(documents), backend="numpy" if HAS_NUMPY and bm25.N >= core.NUMPY_MIN_DOCS else "python")
+
+        for domain in CSV_CONFIG:
+            record(f"search/{domain}", lambda query, domain=domain: search(query, domain, MAX_RESULTS), query_calls)
+        for stack in AVAILABLE_STACKS:
+            record(f"stack/{stack}", lambda query, stack=stack: search_stack(query, stack, MAX_RESULTS), query_calls)
+
+        generator = DesignSystemGenerator(cache_size=0)
+        design_calls = [(query,) for query in DESIGN_SYSTEM_QUERIES]
+        record("generate", generator.generate, design_calls)
+
+        design_systems = [(generator.generate(query, "Benchmark"),) for query in DESIGN_SYSTEM_QUERIES]
+        record("format/ascii", format_ascii_box, design_systems)
+        record("format/markdown", format_markdown, design_systems)
+        record("format/master", format_master_md, design_systems)
+        record("format/page", lambda design_system: format_page_override_md(design_system, "dashboard", "dashboard"),
+               design_systems)
+    finally:
+        core.query_cache.maxsize = saved_cache_size
+
+    return {"meta": _meta(repeat, scales), "benchmarks": results}
+
+
+def _meta(repeat: int, scales) -> dict:
+    """Environment and settings recorded with every result set."""
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": HAS_NUMPY,
+        "repeat": repeat,
+        "scales": list(scales),
+        "queries": len(QUERIES)
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """(name, baseline p50, current p50, ratio) for benchmarks slower than threshold x baseline."""
+    regressions = []
+    for name, stats in results["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before or not before["p50_ms"]:
+            continue
+        ratio = stats["p50_ms"] / before["p50_ms"]
+        if ratio > threshold:
+            regressions.append((name, before["p50_ms"], stats["p50_ms"], ratio))
+    return regressions
+
+
+# ============ OUTPUT ============
+def _format_row(name: str, stats: dict) -> str:
+    """One table row of benchmark stats."""
+    return (f"{name:<28} {stats['n']:>6} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['p99_ms']:>10.3f} "
+            f"{stats['ops_per_sec']:>12.1f} {stats['peak_kib']:>10.1f}")
+
+
+def _header() -> str:
+    """Column titles matching _format_row()."""
+    return f"{'benchmark':<28} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>12} {'peak KiB':>10}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max Benchmark")
+    parser.add_argument("--repeat", "-r", type=int, default=DEFAULT_REPEAT, help=f"Passes over the query set (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--scales", type=str, default=",".join(map(str, DEFAULT_SCALES)), help="Synthetic corpus multipliers, comma-separated ('' to skip)")
+    parser.add_argument("--output", "-o", type=str, default=None, help="Write JSON results to this file")
+    parser.add_argument("--json", action="store_true", help="Print JSON results instead of a table")
+    parser.add_argument("--compare", type=str, default=None, metavar="BASELINE", help="JSON results of an earlier run to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio counted as a regression (default: 1.25)")
+    parser.add_argument("--startup", action="store_true", help="Only time CLI cold starts (startup/* benchmarks)")
+    parser.add_argument("--startup-budget", type=float, default=None, metavar="MS", help="Fail when a startup/* p50 (search, design_system) exceeds MS milliseconds")
+
+    args = parser.parse_args()
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+
+    if not args.json:
+        print(_header())
+    log = None if args.json else print
+    if args.startup:
+        results = {"meta": _meta(args.repeat, []), "benchmarks": run_startup(args.repeat, log)}
+    else:
+        results = run_benchmarks(args.repeat, scales, log)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: p50 {before:.3f} ms -> {after:.3f} ms ({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No p50 regressions over {args.threshold}x", file=sys.stderr)
+
+    if args.startup_budget is not None:
+        over_budget = False
+        for name in STARTUP_COMMANDS:
+            startup_ms = results["benchmarks"][f"startup/{name}"]["p50_ms"]
+            if startup_ms > args.startup_budget:
+                print(f"STARTUP OVER BUDGET {name}: p50 {startup_ms:.1f} ms > {args.startup_budget:.1f} ms", file=sys.stderr)
+                over_budget = True
+            else:
+                print(f"Startup {name} p50 {startup_ms:.1f} ms within {args.startup_budget:.1f} ms budget", file=sys.stderr)
+        if over_budget:
+            sys.exit(1)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Client - thin client for a running `search.py --serve --socket` server.
+Imports nothing from the search engine, so it starts in a few milliseconds.
+
+Usage: python client.py "<query>" --socket /tmp/uipro.sock [--domain <domain>] [--max-results 3]
+       python client.py "<query>" --socket /tmp/uipro.sock --stack react
+       python client.py "<query>" --socket /tmp/uipro.sock --design-system [-p "Project Name"] [-f markdown]
+"""
+
+import argparse
+import io
+import json
+import socket
+import sys
+
+# Force UTF-8 for stdout to handle emojis on Windows (cp1252 default)
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+
+def request(socket_path, payload, timeout=30.0):
+    """Send one request dict to the server and return the response dict"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as f:
+            line = f.readline()
+    if not line:
+        return {"id": payload.get("id"), "error": "Server closed the connection"}
+    return json.loads(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max Client")
+    parser.add_argument("query", help="Search query")
+    parser.add_argument("--socket", required=True, help="Unix socket of a running search.py --serve")
+    parser.add_argument("--domain", "-d", help="Search domain")
+    parser.add_argument("--stack", "-s", help="Stack-specific search")
+    parser.add_argument("--max-results", "-n", type=int, default=3, help="Max results (default: 3)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
+    parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
+    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for the server (default: 30)")
+
+    args = parser.parse_args()
+
+    if args.design_system:
+        payload = {"type": "design_system", "query": args.query, "project_name": args.project_name, "format": args.format}
+    elif args.stack:
+        payload = {"type": "stack", "query": args.query, "stack": args.stack, "max_results": args.max_results, "format": "text"}
+    else:
+        payload = {"type": "search", "query": args.query, "domain": args.domain, "max_results": args.max_results, "format": "text"}
+
+    response = request(args.socket, payload, args.timeout)
+    if "error" in response:
+        print(f"Error: {response['error']}")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(response["result"], indent=2, ensure_ascii=False))
+    else:
+        print(response["output"])
@@ -5,14 +5,41 @@ UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
 import csv
+import hashlib
+import heapq
+import io
+import mmap
+import os
 import re
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from math import log
-from collections import defaultdict
+from math import isfinite, log
+from collections import Counter, OrderedDict, defaultdict, deque
+from collections.abc import Mapping, Sequence
+from array import array
+from itertools import chain, islice, repeat
+
+np = None  # numpy, imported by _numpy() on first use (False if missing): it dominates CLI start-up time
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
+INDEX_DIR = Path(__file__).parent.parent / ".index_cache"
+INDEX_VERSION = 8
 MAX_RESULTS = 3
+NUMPY_MIN_DOCS = 1000  # Auto-select the NumPy backend from this corpus size
+NUMPY_BATCH_SIZE = 64  # Queries scored together per block in score_many()
+QUERY_CACHE_SIZE = 512  # Cached result lists kept by search() / search_stack()
+QUERY_CACHE_TTL = None  # Seconds before a cached result expires (None: until evicted or the CSV changes)
+TOKEN_CACHE_SIZE = 4096  # Strings whose tokens each Tokenizer remembers
+STREAM_CACHE_SIZE = 64  # Partially ranked queries kept for search_page() cursors
+
+# A domain or stack entry may add "tokenizer": {"min_length": 3, "stopwords": [...], "stem": False}
+# and "field_weights": {"<search col>": 2.0, ...} to rank with BM25F instead of plain BM25
 
 CSV_CONFIG = {
     "style": {
@@ -91,126 +118,1401 @@ _STACK_COLS = {
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
+# detect_domain(): substrings of the lowercased query that point to a domain
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+}
+
+
+# ============ INSTRUMENTATION ============
+class SearchStats:
+    """Stage timings, counters and corpus sizes recorded inside profiling()
+
+    Stage times are inclusive wall-clock sums, so a nested stage (e.g. fit
+    during a design system search) also counts towards its parent. Stages
+    running concurrently in pool threads each add their own wall time.
+    """
+
+    def __init__(self):
+        self.stages = defaultdict(float)  # stage -> seconds
+        self.counters = defaultdict(int)
+        self.corpus = {}                  # CSV file name -> documents
+        self.lock = threading.Lock()      # Pool threads record into the same stats
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def as_dict(self):
+        """JSON-ready stats, times in milliseconds"""
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        return {
+            "total_ms": round(elapsed * 1000, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            "counters": dict(self.counters),
+            "corpus": dict(self.corpus)
+        }
+
+
+_ACTIVE_STATS = ContextVar("uipro_search_stats", default=None)
+
+
+@contextmanager
+def profiling():
+    """Collect SearchStats for every search made inside the block: with profiling() as stats: ..."""
+    stats = SearchStats()
+    token = _ACTIVE_STATS.set(stats)
+    try:
+        yield stats
+    finally:
+        stats.elapsed = time.perf_counter() - stats.started
+        _ACTIVE_STATS.reset(token)
+
+
+@contextmanager
+def profile_stage(stage):
+    """Add the block's wall time to a stage while profiling() is active (also usable as a decorator)"""
+    stats = _ACTIVE_STATS.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with stats.lock:
+            stats.stages[stage] += elapsed
+
+
+def profile_count(counter, n=1):
+    """Increment a counter while profiling() is active"""
+    stats = _ACTIVE_STATS.get()
+    if stats is not None:
+        with stats.lock:
+            stats.counters[counter] += n
+
+
+# ============ TOKENIZER ============
+class Tokenizer:
+    """Lowercases text and splits it into word tokens of at least min_length characters
+
+    stopwords are dropped after lowercasing. stem=True applies a light
+    plural stemmer ("animations" -> "animation", "galleries" -> "gallery").
+    Calling the tokenizer caches the tokens of repeated strings such as
+    queries; tokenize() is the uncached path used to fit documents.
+    """
+
+    __slots__ = ("min_length", "stopwords", "stem", "signature", "_pattern", "_cache", "_stems")
+
+    def __init__(self, min_length=3, stopwords=(), stem=False):
+        self.min_length = min_length
+        self.stopwords = frozenset(word.lower() for word in stopwords)
+        self.stem = stem
+        self.signature = f"min={min_length};stem={int(stem)};stop={','.join(sorted(self.stopwords))}"
+        self._pattern = re.compile(r"\w{%d,}" % max(min_length, 1))  # Words are runs of \w characters
+        self._cache = {}  # text -> tokens tuple
+        self._stems = {}  # word -> stem
+
+    def tokenize(self, text):
+        """Lowercase, split on non-word characters, drop short words and stopwords, stem"""
+        tokens = self._pattern.findall(str(text).lower())
+        if self.stopwords:
+            tokens = [word for word in tokens if word not in self.stopwords]
+        if self.stem:
+            stems = self._stems
+            if len(stems) >= TOKEN_CACHE_SIZE:
+                stems.clear()
+            tokens = [stems.get(word) or stems.setdefault(word, self._stem(word)) for word in tokens]
+        return tokens
+
+    def __call__(self, text):
+        """tokenize() as a tuple, cached for repeated strings"""
+        tokens = self._cache.get(text)
+        if tokens is None:
+            if len(self._cache) >= TOKEN_CACHE_SIZE:
+                self._cache.clear()
+            tokens = self._cache[text] = tuple(self.tokenize(text))
+        return tokens
+
+    def _stem(self, word):
+        """S-stemmer: strip regular plural endings, keeping words of at least min_length"""
+        if word.endswith("ies") and not word.endswith(("eies", "aies")):
+            stem = word[:-3] + "y"
+        elif word.endswith("sses"):
+            stem = word[:-2]
+        elif word.endswith("es") and not word.endswith(("aes", "ees", "oes")):
+            stem = word[:-1]
+        elif word.endswith("s") and not word.endswith(("us", "ss", "is")):
+            stem = word[:-1]
+        else:
+            return word
+        return stem if len(stem) >= self.min_length else word
+
+
+_TOKENIZERS = {}
+
+
+def get_tokenizer(settings=None):
+    """Shared Tokenizer for a domain's "tokenizer" settings dict (defaults when omitted)"""
+    settings = settings or {}
+    key = (settings.get("min_length", 3), tuple(sorted(settings.get("stopwords", ()))), bool(settings.get("stem", False)))
+    tokenizer = _TOKENIZERS.get(key)
+    if tokenizer is None:
+        tokenizer = _TOKENIZERS.setdefault(key, Tokenizer(key[0], key[1], key[2]))
+    return tokenizer
+
 
 # ============ BM25 IMPLEMENTATION ============
+def _numpy():
+    """The numpy module, imported on first use; None when it is not installed (pure-Python scoring)"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        np = numpy
+    return np or None
+
+
+def _splice_rows(ptr, columns, rows, count):
+    """Copy a CSR layout with some rows replaced; returns (ptr, [column arrays])
+
+    Row r spans column[ptr[r] * width:ptr[r + 1] * width] of each
+    (column, width) pair in columns. rows maps a replaced or appended row to
+    its new values, one sequence per column. The copy has count rows; runs
+    of untouched rows are copied as single slices.
+    """
+    new_ptr = array('I', [0])
+    new_columns = [array('I') for _ in columns]
+    old_count = len(ptr) - 1
+    copied = 0  # first old row not copied yet
+    for row in sorted(rows) + [count]:
+        end = min(row, old_count)
+        if copied < end:
+            start, stop = ptr[copied], ptr[end]
+            for new_column, (column, width) in zip(new_columns, columns):
+                new_column.extend(column[start * width:stop * width])
+            shift = new_ptr[-1] - start
+            block = ptr[copied + 1:end + 1]
+            new_ptr.extend(block if shift == 0 else (offset + shift for offset in block))
+        if row == count:
+            break
+        values = rows[row]
+        for new_column, column_values in zip(new_columns, values):
+            new_column.extend(column_values)
+        new_ptr.append(new_ptr[-1] + len(values[0]))
+        copied = row + 1
+    return new_ptr, new_columns
+
+
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search
+
+    The index is array-backed: terms are interned and mapped to integer
+    ids, token streams and CSR postings (term -> doc ids / term freqs) live
+    in array('I') buffers and doc lengths in array('H').
+
+    backend: "python", "numpy", or None to use NumPy automatically for
+    corpora of NUMPY_MIN_DOCS or more documents when it is installed.
+    Both backends return identical rankings.
+
+    tokenizer: a Tokenizer (the default settings when omitted).
+
+    Documents fitted as sequences of field texts also keep each field's
+    token count and per-field term frequencies next to post_tfs, so
+    score_fields() can rank them with BM25F.
+
+    IDF comes from posting counts and length norms from doc_lengths and
+    avgdl when scoring, so refit() only patches the documents that changed.
+    """
 
-    def __init__(self, k1=1.5, b=0.75):
+    __slots__ = ("k1", "b", "backend", "tokenizer", "vocab", "terms", "tokens", "doc_offsets", "doc_lengths", "doc_hashes",
+                 "fields", "field_lengths", "avgdl", "post_ptr", "post_docs", "post_tfs", "post_field_tfs",
+                 "N", "_matrix", "_norms", "_field_norms")
+
+    def __init__(self, k1=1.5, b=0.75, backend=None, tokenizer=None):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.backend = backend
+        self.tokenizer = tokenizer or get_tokenizer()
+        self._matrix = None
+        self._norms = None
+        self._field_norms = None
+        self.vocab = {}                  # term -> term id
+        self.terms = []                  # term id -> term
+        self.tokens = array('I')         # concatenated token ids of every document
+        self.doc_offsets = array('I', [0])  # document i spans tokens[doc_offsets[i]:doc_offsets[i + 1]]
+        self.doc_lengths = array('H')
+        self.doc_hashes = b""            # 16-byte BLAKE2b digest of each document's text
+        self.fields = 1                  # fields per document
+        self.field_lengths = array('I')  # token count of field f of document i at [i * fields + f]
         self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
+        self.post_ptr = array('I', [0])  # term t spans post_docs[post_ptr[t]:post_ptr[t + 1]]
+        self.post_docs = array('I')
+        self.post_tfs = array('I')
+        self.post_field_tfs = array('I')  # term freq of posting p in field f at [p * fields + f]; empty for one field
         self.N = 0
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        return self.tokenizer.tokenize(text)
 
     def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        """Build BM25 index (postings lists + document lengths) from documents
+
+        A document is a string, or a tuple/list of field strings (the same
+        number for every document) indexed as their space-joined text.
+        """
+        self.__init__(self.k1, self.b, self.backend, self.tokenizer)  # Drop any previous index
+        tokens = self.tokens
+        field_lengths = self.field_lengths
+        lengths = []
+        term_postings = defaultdict(list)  # term id -> [(doc_idx, term_freq, per-field term freqs), ...] while building
+        doc_hashes = bytearray()
+
+        for idx, document in enumerate(documents):
+            fields = self._document_fields(document)
+            if idx == 0:
+                self.fields = len(fields)
+            elif len(fields) != self.fields:
+                raise ValueError(f"Document {idx} has {len(fields)} fields, expected {self.fields}")
+            doc_hashes += self._document_hash(fields)
+            doc_term_ids = self._term_ids(fields, field_lengths)
+            for term_id, tf, field_tfs in self._term_freqs(doc_term_ids, field_lengths[idx * self.fields:]):
+                term_postings[term_id].append((idx, tf, field_tfs))
+            tokens.extend(doc_term_ids)
+            lengths.append(len(doc_term_ids))
+            self.doc_offsets.append(len(tokens))
+
+        self.doc_hashes = bytes(doc_hashes)
+        self.N = len(lengths)
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
+        self.doc_lengths = array('H' if max(lengths) <= 0xFFFF else 'I', lengths)
+        self.avgdl = sum(lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+        # CSR postings in ascending doc order per term
+        for term_id in range(len(self.terms)):
+            postings = term_postings.get(term_id)
+            if postings:
+                docs, tfs, field_tfs = zip(*postings)
+                self.post_docs.extend(docs)
+                self.post_tfs.extend(tfs)
+                self.post_field_tfs.extend(chain.from_iterable(field_tfs))
+            self.post_ptr.append(len(self.post_docs))
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+    def refit(self, documents):
+        """A new BM25 for documents, patched from this fitted index
 
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        Document i is compared with indexed document i by text hash. Only
+        edited and appended documents are tokenized (or copy the token ids
+        of an identical indexed document), and only the postings of terms
+        in edited, appended or removed documents are rebuilt; the rest of
+        the index is copied in blocks. This index is left untouched, so it
+        can keep serving searches meanwhile. Falls back to fit() when the
+        field count differs.
+        """
+        documents = [self._document_fields(document) for document in documents]
+        bm25 = BM25(self.k1, self.b, self.backend, self.tokenizer)
+        if not documents or self.N == 0 or any(len(fields) != self.fields for fields in documents):
+            bm25.fit(documents)
+            return bm25
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+        fields = self.fields
+        digests = [self._document_hash(document) for document in documents]
+        old_hashes = bytes(self.doc_hashes)
+        changed = [idx for idx, digest in enumerate(digests) if old_hashes[16 * idx:16 * idx + 16] != digest]
+        stale = {idx for idx in changed if idx < self.N}.union(range(len(documents), self.N))
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+        bm25.terms = list(self.terms)
+        bm25.vocab = dict(zip(bm25.terms, range(len(bm25.terms))))
+        bm25.fields = fields
+        bm25.doc_hashes = b"".join(digests)
+        tokens, doc_offsets = self.tokens, self.doc_offsets
+        reusable = {old_hashes[16 * idx:16 * idx + 16]: idx for idx in range(self.N)} if changed else {}
 
-            scores.append((idx, score))
+        # Token ids, lengths and postings of the changed documents
+        doc_rows = {}
+        doc_lengths = array('I', self.doc_lengths[:len(documents)])
+        field_lengths = array('I', self.field_lengths[:len(documents) * fields])
+        added = defaultdict(list)  # term id -> [(doc_idx, term_freq, per-field term freqs), ...]
+        for idx in changed:
+            old_idx = reusable.get(digests[idx])
+            if old_idx is None:
+                lengths = array('I')
+                doc_term_ids = bm25._term_ids(documents[idx], lengths)
+            else:
+                lengths = self.field_lengths[old_idx * fields:(old_idx + 1) * fields]
+                doc_term_ids = tokens[doc_offsets[old_idx]:doc_offsets[old_idx + 1]]
+            for term_id, tf, field_tfs in self._term_freqs(doc_term_ids, lengths):
+                added[term_id].append((idx, tf, field_tfs))
+            doc_rows[idx] = (doc_term_ids,)
+            if idx < len(doc_lengths):
+                doc_lengths[idx] = len(doc_term_ids)
+                field_lengths[idx * fields:(idx + 1) * fields] = array('I', lengths)
+            else:
+                doc_lengths.append(len(doc_term_ids))
+                field_lengths.extend(lengths)
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+        # Posting rows of every term in a stale or changed document, in ascending doc order
+        width = fields if fields > 1 else 0
+        stale_terms = set()
+        for idx in stale:
+            stale_terms.update(tokens[doc_offsets[idx]:doc_offsets[idx + 1]])
+        post_rows = {}
+        for term_id in stale_terms.union(added):
+            kept = []
+            if term_id < len(self.terms):
+                for posting in range(self.post_ptr[term_id], self.post_ptr[term_id + 1]):
+                    if self.post_docs[posting] not in stale:
+                        kept.append((self.post_docs[posting], self.post_tfs[posting],
+                                     self.post_field_tfs[posting * width:(posting + 1) * width]))
+            postings = list(heapq.merge(kept, added.get(term_id, ())))
+            docs, tfs, field_tfs = zip(*postings) if postings else ((), (), ())
+            post_rows[term_id] = (docs, tfs, list(chain.from_iterable(field_tfs)))
 
+        bm25.post_ptr, (bm25.post_docs, bm25.post_tfs, bm25.post_field_tfs) = _splice_rows(
+            self.post_ptr, [(self.post_docs, 1), (self.post_tfs, 1), (self.post_field_tfs, width)],
+            post_rows, len(bm25.terms))
+        bm25.doc_offsets, (bm25.tokens,) = _splice_rows(doc_offsets, [(tokens, 1)], doc_rows, len(documents))
+        bm25.doc_lengths = doc_lengths
+        bm25.field_lengths = field_lengths
+        bm25.N = len(documents)
+        bm25.avgdl = sum(doc_lengths) / bm25.N
+        return bm25
 
-# ============ SEARCH FUNCTIONS ============
-def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+    @staticmethod
+    def _document_fields(document):
+        """Field texts of a document given as a string or a tuple/list of fields"""
+        return [str(field) for field in document] if isinstance(document, (tuple, list)) else [str(document)]
 
+    @staticmethod
+    def _document_hash(fields):
+        """16-byte BLAKE2b digest of a document's space-joined text"""
+        return hashlib.blake2b(" ".join(fields).encode("utf-8"), digest_size=16).digest()
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
+    def _term_ids(self, fields, field_lengths):
+        """Token ids of a document's fields, interning new terms; appends each field's token count"""
+        vocab = self.vocab
+        terms = self.terms
+        tokenize = self.tokenize
+        doc_term_ids = []
+        for field in fields:
+            # Tokens never span the joining space, so this is the joined text's token stream
+            words = tokenize(field)
+            for word in words:
+                term_id = vocab.get(word)
+                if term_id is None:
+                    term_id = vocab[sys.intern(word)] = len(terms)
+                    terms.append(word)
+                doc_term_ids.append(term_id)
+            field_lengths.append(len(words))
+        return doc_term_ids
+
+    def _term_freqs(self, doc_term_ids, field_lengths):
+        """(term id, term freq, per-field term freqs) for each distinct term of a document
+
+        field_lengths starts with the document's field token counts.
+        """
+        counts = Counter(doc_term_ids)
+        if self.fields == 1:
+            return [(term_id, tf, ()) for term_id, tf in counts.items()]
+        # Term freqs per field, one column per field in the order of counts
+        columns = []
+        start = 0
+        for length in field_lengths[:self.fields]:
+            columns.append(map(Counter(doc_term_ids[start:start + length]).get, counts, repeat(0)))
+            start += length
+        return [(term_id, tf, field_tfs) for (term_id, tf), field_tfs in zip(counts.items(), zip(*columns))]
+
+    def term_postings(self, term_id):
+        """(doc_idx, term_freq) pairs for a term id, in ascending doc order"""
+        start, end = self.post_ptr[term_id], self.post_ptr[term_id + 1]
+        return zip(self.post_docs[start:end], self.post_tfs[start:end])
+
+    def doc_freq(self, term):
+        """Number of documents containing term"""
+        term_id = self.vocab.get(term)
+        return 0 if term_id is None else self.post_ptr[term_id + 1] - self.post_ptr[term_id]
+
+    def score(self, query, top_k=None):
+        """Score documents containing query terms, best first.
+
+        Only documents that share at least one token with the query are
+        returned. Ties keep corpus order. With top_k, a heap selects the
+        best k instead of sorting every match.
+        """
+        return self.score_tokens(self.tokenizer(query), top_k)
+
+    def score_tokens(self, query_tokens, top_k=None):
+        """score() for a query already split by this index's tokenizer"""
+        if self._use_numpy():
+            return self._rank_numpy(self._scores_numpy(query_tokens), top_k)
+
+        scores = self._scores(query_tokens)
+        if top_k is None:
+            return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return heapq.nlargest(top_k, scores.items(), key=lambda x: (x[1], -x[0]))
+
+    def score_fields(self, query, weights, top_k=None):
+        """BM25F: score() with one weight per field, in fit() field order.
+
+        Each field's term frequency is normalized by that field's average
+        length and weighted before the k1 saturation, so a match in a
+        heavily weighted field outranks several in light ones. A single
+        field of weight 1 scores like score(). Always pure Python.
+        """
+        scores = self._field_scores(self.tokenizer(query), weights)
+        if top_k is None:
+            return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return heapq.nlargest(top_k, scores.items(), key=lambda x: (x[1], -x[0]))
+
+    def iter_score(self, query, weights=None):
+        """Yield (doc index, score) in score() order (score_fields() order with weights), ranking lazily.
+
+        Matches are heapified once and popped on demand, so taking the
+        first k of n matches costs O(n + k log n) instead of a full sort.
+        """
+        query_tokens = self.tokenizer(query)
+        if weights is not None:
+            heap = [(-score, idx) for idx, score in self._field_scores(query_tokens, weights).items()]
+        elif self._use_numpy():
+            scores = self._scores_numpy(query_tokens)
+            heap = [(-float(scores[idx]), int(idx)) for idx in np.flatnonzero(scores)]
+        else:
+            heap = [(-score, idx) for idx, score in self._scores(query_tokens).items()]
+        heapq.heapify(heap)
+        while heap:
+            neg_score, idx = heapq.heappop(heap)
+            yield idx, -neg_score
+
+    def _idf(self, term_id):
+        """Inverse document frequency of a term id, from its posting count"""
+        freq = self.post_ptr[term_id + 1] - self.post_ptr[term_id]
+        return log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+
+    def _length_norms(self):
+        """Length normalization part of the BM25 denominator, per document, built on first use"""
+        if self._norms is None:
+            k1, b = self.k1, self.b
+            avgdl = self.avgdl or 1
+            self._norms = array('d', (k1 * (1 - b + b * doc_len / avgdl) for doc_len in self.doc_lengths))
+        return self._norms
+
+    def _scores(self, query_tokens):
+        """{doc index: BM25 score} for documents sharing a term with the query"""
+        scores = {}
+        k1_plus_1 = self.k1 + 1
+        norms = self._length_norms()
+
+        for token in query_tokens:
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                continue
+            idf = self._idf(term_id)
+            for idx, tf in self.term_postings(term_id):
+                scores[idx] = scores.get(idx, 0) + idf * (tf * k1_plus_1) / (tf + norms[idx])
+        return scores
+
+    def _field_scores(self, query_tokens, weights):
+        """{doc index: BM25F score} for documents sharing a term with the query"""
+        if self.N == 0:
+            return {}  # An empty corpus never saw a document, so it has no field count to check against
+        fields = self.fields
+        if len(weights) != fields:
+            raise ValueError(f"Expected {fields} field weights, got {len(weights)}")
+        if self._field_norms is None:
+            self._field_norms = self._inverse_field_norms()
+        inverse_norms = self._field_norms
+        field_tfs = self.post_field_tfs if fields > 1 else self.post_tfs
+        weighted = [(field, weight) for field, weight in enumerate(weights) if weight]
+        post_docs = self.post_docs
+        k1 = self.k1
+        scores = {}
+
+        for token in query_tokens:
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                continue
+            idf = self._idf(term_id)
+            for posting in range(self.post_ptr[term_id], self.post_ptr[term_id + 1]):
+                idx = post_docs[posting]
+                tf = 0.0
+                for field, weight in weighted:
+                    tf += weight * field_tfs[posting * fields + field] * inverse_norms[idx * fields + field]
+                if tf > 0:
+                    scores[idx] = scores.get(idx, 0) + idf * tf * (k1 + 1) / (k1 + tf)
+        return scores
+
+    def _inverse_field_norms(self):
+        """1 / (1 - b + b * field length / average field length), per document field"""
+        fields = self.fields
+        totals = [0] * fields
+        for slot, length in enumerate(self.field_lengths):
+            totals[slot % fields] += length
+        averages = [total / self.N if total else 1 for total in totals]
+        norms = (1 - self.b + self.b * length / averages[slot % fields] for slot, length in enumerate(self.field_lengths))
+        return array('d', (1 / norm if norm else 0.0 for norm in norms))
+
+    def score_many(self, queries, top_k=None):
+        """Score several queries, returning one ranking per query.
+
+        With NumPy, each block of queries is scored as a sparse
+        query-term x term-document product; scores can then differ from
+        score() in the last floating-point bits.
+        """
+        if not self._use_numpy():
+            return [self.score(query, top_k) for query in queries]
+
+        vocab, indptr, indices, weights = self._term_matrix()
+        rankings = []
+        for start in range(0, len(queries), NUMPY_BATCH_SIZE):
+            block = queries[start:start + NUMPY_BATCH_SIZE]
+
+            # Sparse query-term counts: term row -> {query position: count}
+            term_counts = {}
+            for pos, query in enumerate(block):
+                for token in self.tokenizer(query):
+                    row = vocab.get(token)
+                    if row is not None:
+                        counts = term_counts.setdefault(row, {})
+                        counts[pos] = counts.get(pos, 0) + 1
+
+            scores = np.zeros((len(block), self.N))
+            for row, counts in term_counts.items():
+                start_ptr, end_ptr = indptr[row], indptr[row + 1]
+                positions = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                multiplicity = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+                scores[np.ix_(positions, indices[start_ptr:end_ptr])] += multiplicity[:, None] * weights[start_ptr:end_ptr]
+
+            rankings.extend(self._rank_numpy(row_scores, top_k) for row_scores in scores)
+        return rankings
+
+    # ---- NumPy backend ----
+    def _use_numpy(self):
+        """Whether to score with the NumPy backend"""
+        if self.backend == "python" or (self.backend != "numpy" and self.N < NUMPY_MIN_DOCS):
+            return False
+        return _numpy() is not None
+
+    def _term_matrix(self):
+        """CSR term-document matrix of precomputed BM25 term weights, built on first use"""
+        if self._matrix is None:
+            indptr = np.frombuffer(self.post_ptr, dtype=np.uint32).astype(np.int64)
+            indices = np.frombuffer(self.post_docs, dtype=np.uint32).astype(np.int64)
+            tfs = np.frombuffer(self.post_tfs, dtype=np.uint32).astype(np.float64)
+            idf = np.fromiter(map(self._idf, range(len(indptr) - 1)), dtype=np.float64, count=len(indptr) - 1)
+            idf = np.repeat(idf, np.diff(indptr))
+            norms = np.frombuffer(self._length_norms(), dtype=np.float64)[indices]
+            weights = idf * (tfs * (self.k1 + 1)) / (tfs + norms)
+            self._matrix = (self.vocab, indptr, indices, weights)
+        return self._matrix
+
+    def _scores_numpy(self, query_tokens):
+        """Dense score vector: sparse row gather + sum over the term-document matrix"""
+        vocab, indptr, indices, weights = self._term_matrix()
+        scores = np.zeros(self.N)
+        for token in query_tokens:
+            row = vocab.get(token)
+            if row is None:
+                continue
+            start, end = indptr[row], indptr[row + 1]
+            scores[indices[start:end]] += weights[start:end]
+        return scores
+
+    @staticmethod
+    def _rank_numpy(scores, top_k):
+        """Matching documents best first, ties in corpus order"""
+        matched = np.flatnonzero(scores)
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        if top_k is not None:
+            order = order[:top_k]
+        return [(int(idx), float(scores[idx])) for idx in order]
+
+
+# ============ BINARY INDEX ============
+# Versioned on-disk index, opened with mmap and queried in place.
+#
+#   header    INDEX_MAGIC, version, byte order, k1, b, avgdl, N, V, nnz,
+#             source CSV size / mtime_ns / SHA-1, search-column + tokenizer signature, fields per document
+#   sections  (offset, length) table, then 8-byte aligned sections:
+#             vocab_offsets I[V+1] + vocab_blob  sorted UTF-8 terms (term id = rank)
+#             post_ptr I[V+1], post_docs I[nnz], post_tfs I[nnz]
+#             doc_lengths I[N], doc_offsets I[N+1], tokens I[...]
+#             row_offsets Q[N+1]  byte offsets of each data row in the CSV
+#             fieldnames          NUL-separated CSV header
+#             doc_hashes          16-byte BLAKE2b digest per document, for incremental refits
+#             field_lengths I[N * fields]  token count of each search column, for BM25F
+#             post_field_tfs I[nnz * fields]  per-column term freq of each posting (empty for one column)
+INDEX_MAGIC = b"UXPMIDX\0"
+_HEADER = struct.Struct("<8sIIdddIIIQQ20s20sI")
+_SECTIONS = ("vocab_offsets", "vocab_blob", "post_ptr", "post_docs", "post_tfs",
+             "doc_lengths", "doc_offsets", "tokens", "row_offsets", "fieldnames", "doc_hashes", "field_lengths",
+             "post_field_tfs")
+_SECTION_TABLE = struct.Struct("<" + "QQ" * len(_SECTIONS))
+_SECTION_TYPES = {"vocab_offsets": "I", "post_ptr": "I", "post_docs": "I", "post_tfs": "I",
+                  "doc_lengths": "I", "doc_offsets": "I", "tokens": "I", "row_offsets": "Q",
+                  "field_lengths": "I", "post_field_tfs": "I"}
+_LITTLE_ENDIAN = 1 if sys.byteorder == "little" else 0
+
+
+def _file_hash(filepath):
+    """SHA-1 of the raw CSV bytes, used to validate the index"""
+    with open(filepath, 'rb') as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def _index_signature(search_cols, tokenizer):
+    """SHA-1 identifying how documents are built from CSV rows and tokenized"""
+    return hashlib.sha1("\x1f".join([*search_cols, tokenizer.signature]).encode("utf-8")).digest()
+
+
+def _index_path(filepath):
+    """Index file for a CSV, mirroring its path relative to DATA_DIR"""
+    try:
+        rel = filepath.resolve().relative_to(DATA_DIR.resolve())
+    except ValueError:
+        rel = Path(filepath.name)
+    return INDEX_DIR / (rel.as_posix().replace("/", "__") + ".idx")
+
+
+class _MappedVocab(Mapping):
+    """Read-only term -> term id mapping, binary-searched over the sorted vocabulary"""
+
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def term(self, term_id):
+        return str(self.blob[self.offsets[term_id]:self.offsets[term_id + 1]], "utf-8")
+
+    def __getitem__(self, term):
+        key = term.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate = bytes(self.blob[self.offsets[mid]:self.offsets[mid + 1]])
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                return mid
+        raise KeyError(term)
+
+    def __iter__(self):
+        return (self.term(term_id) for term_id in range(len(self)))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def items(self):
+        """(term, term id) pairs without a lookup per term"""
+        return ((self.term(term_id), term_id) for term_id in range(len(self)))
+
+
+class _MappedTerms(Sequence):
+    """Term id -> term view over a _MappedVocab"""
+
+    __slots__ = ("vocab",)
+
+    def __init__(self, vocab):
+        self.vocab = vocab
+
+    def __getitem__(self, term_id):
+        return self.vocab.term(term_id)
+
+    def __iter__(self):
+        blob = bytes(self.vocab.blob)
+        offsets = self.vocab.offsets
+        return (str(blob[start:end], "utf-8") for start, end in zip(offsets, offsets[1:]))
+
+    def __len__(self):
+        return len(self.vocab)
+
+
+class _StaleRowsError(RuntimeError):
+    """The CSV behind a loaded index changed, so its row offsets are invalid"""
+
+    def __init__(self, filepath):
+        super().__init__(f"{filepath} changed since its index was loaded")
+        self.filepath = filepath
+
+
+class CsvRows(Sequence):
+    """CSV data rows kept as byte offsets and decoded only when requested"""
+
+    __slots__ = ("filepath", "fieldnames", "offsets", "positions", "source")
+
+    def __init__(self, filepath, fieldnames, offsets, source):
+        self.filepath = filepath
+        self.fieldnames = fieldnames
+        self.offsets = offsets  # row i spans bytes [offsets[i], offsets[i + 1])
+        self.source = source    # (size, mtime_ns) of the CSV the offsets belong to
+        # Column -> field position; like DictReader, the last duplicate name wins
+        self.positions = {name: pos for pos, name in enumerate(fieldnames)}
+
+    def materialize(self, indices, columns=None):
+        """Decode rows by index, keeping only columns (all fields when None)"""
+        if columns is None:
+            columns = self.fieldnames
+        wanted = [(col, self.positions[col]) for col in columns if col in self.positions]
+        rows = []
+        with open(self.filepath, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if (stat.st_size, stat.st_mtime_ns) != self.source:
+                raise _StaleRowsError(self.filepath)
+            for idx in indices:
+                start, end = self.offsets[idx], self.offsets[idx + 1]
+                f.seek(start)
+                text = io.StringIO(f.read(end - start).decode("utf-8"), newline=None)
+                fields = next((row for row in csv.reader(text) if row), [])
+                # Short rows yield None for missing fields, as DictReader does
+                rows.append({col: fields[pos] if pos < len(fields) else None for col, pos in wanted})
+        return rows
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self)
+        return self.materialize([idx])[0]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+def _scan_csv(filepath, search_cols):
+    """Parse a CSV once, returning (fieldnames, search documents, byte offsets of each row)
+
+    Each document is a tuple with the text of every search column.
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+
+    end_of_line = [0]
+
+    def lines():
+        # Decode line by line so the reader's position maps back to bytes
+        start = 0
+        while start < len(raw):
+            end = raw.find(b"\n", start)
+            end = len(raw) if end < 0 else end + 1
+            end_of_line[0] = end
+            yield raw[start:end].decode("utf-8").replace("\r\n", "\n")
+            start = end
+
+    reader = csv.reader(lines())
+    fieldnames = next(reader, [])
+    positions = {name: pos for pos, name in enumerate(fieldnames)}
+    # Joined, the same text as " ".join(str(row.get(col, "")) ...) over DictReader rows
+    search_positions = [positions.get(col) for col in search_cols]
+
+    offsets = array('Q', [end_of_line[0]])
+    documents = []
+    for fields in reader:
+        if not fields:
+            continue
+        documents.append(tuple(
+            "" if pos is None else (fields[pos] if pos < len(fields) else "None")
+            for pos in search_positions
+        ))
+        offsets.append(end_of_line[0])
+    return fieldnames, documents, offsets
+
+
+def _write_binary_index(index_file, bm25, fieldnames, row_offsets, source, search_cols):
+    """Serialize a fitted BM25 in the binary format; term ids are renumbered in sorted order"""
+    # Terms left without postings by refit() are dropped
+    order = sorted((term_id for term_id in range(len(bm25.terms)) if bm25.post_ptr[term_id + 1] > bm25.post_ptr[term_id]),
+                   key=lambda term_id: bm25.terms[term_id].encode("utf-8"))
+    remap = array('I', bytes(4 * len(bm25.terms)))
+    for new_id, old_id in enumerate(order):
+        remap[old_id] = new_id
+
+    vocab_offsets = array('I', [0])
+    vocab_blob = bytearray()
+    post_ptr = array('I', [0])
+    post_docs = array('I')
+    post_tfs = array('I')
+    post_field_tfs = array('I')
+    fields = bm25.fields if len(bm25.post_field_tfs) else 0
+    for old_id in order:
+        vocab_blob += bm25.terms[old_id].encode("utf-8")
+        vocab_offsets.append(len(vocab_blob))
+        start, end = bm25.post_ptr[old_id], bm25.post_ptr[old_id + 1]
+        post_docs.extend(bm25.post_docs[start:end])
+        post_tfs.extend(bm25.post_tfs[start:end])
+        post_field_tfs.extend(bm25.post_field_tfs[start * fields:end * fields])
+        post_ptr.append(len(post_docs))
+
+    sections = {
+        "vocab_offsets": vocab_offsets,
+        "vocab_blob": bytes(vocab_blob),
+        "post_ptr": post_ptr,
+        "post_docs": post_docs,
+        "post_tfs": post_tfs,
+        "doc_lengths": array('I', bm25.doc_lengths),
+        "doc_offsets": array('I', bm25.doc_offsets),
+        "tokens": array('I', map(remap.__getitem__, bm25.tokens)),
+        "row_offsets": row_offsets,
+        "fieldnames": "\0".join(fieldnames).encode("utf-8"),
+        "doc_hashes": bytes(bm25.doc_hashes),
+        "field_lengths": array('I', bm25.field_lengths),
+        "post_field_tfs": post_field_tfs
+    }
+
+    size, mtime_ns, digest = source
+    header = _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, _LITTLE_ENDIAN, bm25.k1, bm25.b, bm25.avgdl,
+                          bm25.N, len(order), len(post_docs), size, mtime_ns, digest, _index_signature(search_cols, bm25.tokenizer),
+                          bm25.fields)
+    offset = _HEADER.size + _SECTION_TABLE.size
+    table = []
+    payloads = []
+    for name in _SECTIONS:
+        section = sections[name]
+        data = section if isinstance(section, bytes) else section.tobytes()
+        offset += -offset % 8
+        table.extend((offset, len(data)))
+        payloads.append((offset, data))
+        offset += len(data)
+
+    tmp_file = index_file.with_name(f"{index_file.name}.{os.getpid()}.tmp")
+    try:
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            f.write(header)
+            f.write(_SECTION_TABLE.pack(*table))
+            for section_offset, data in payloads:
+                f.write(b"\0" * (section_offset - f.tell()))
+                f.write(data)
+        os.replace(tmp_file, index_file)
+    except OSError:
+        # Read-only install (or index mapped on Windows): keep working without it
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+
+
+def _open_binary_index(index_file, filepath, search_cols, tokenizer=None, stale_ok=False):
+    """mmap a fresh index file and return (rows, bm25) backed by it, else None
+
+    With stale_ok, an index for an older version of the CSV is returned too;
+    its rows keep the old (size, mtime_ns) source and cannot be decoded.
+    """
+    tokenizer = tokenizer or get_tokenizer()
+    try:
+        with open(index_file, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        (magic, version, little_endian, k1, b, avgdl, n_docs, n_terms, nnz,
+         size, mtime_ns, digest, signature, fields) = _HEADER.unpack_from(mm, 0)
+        if (magic != INDEX_MAGIC or version != INDEX_VERSION or little_endian != _LITTLE_ENDIAN
+                or signature != _index_signature(search_cols, tokenizer)):
+            return None
+
+        # Unchanged size + mtime is trusted; otherwise compare content hashes
+        stat = filepath.stat()
+        fresh = (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns) or digest == _file_hash(filepath)
+        if not fresh and not stale_ok:
+            return None
+
+        table = _SECTION_TABLE.unpack_from(mm, _HEADER.size)
+        view = memoryview(mm)
+        sections = {}
+        for i, name in enumerate(_SECTIONS):
+            offset, length = table[2 * i], table[2 * i + 1]
+            if offset + length > len(mm):
+                return None
+            section = view[offset:offset + length]
+            sections[name] = section.cast(_SECTION_TYPES[name]) if name in _SECTION_TYPES else section
+    except (struct.error, OSError, TypeError, ValueError):
+        return None
+
+    bm25 = BM25(k1, b, tokenizer=tokenizer)
+    bm25.vocab = _MappedVocab(sections["vocab_offsets"], sections["vocab_blob"])
+    bm25.terms = _MappedTerms(bm25.vocab)
+    bm25.avgdl = avgdl
+    bm25.N = n_docs
+    bm25.fields = fields
+    for name in ("post_ptr", "post_docs", "post_tfs", "doc_lengths", "doc_offsets", "tokens",
+                 "doc_hashes", "field_lengths", "post_field_tfs"):
+        setattr(bm25, name, sections[name])
+
+    fieldnames = str(sections["fieldnames"], "utf-8").split("\0") if len(sections["fieldnames"]) else []
+    source = (stat.st_size, stat.st_mtime_ns) if fresh else (size, mtime_ns)
+    return CsvRows(filepath, fieldnames, sections["row_offsets"], source), bm25
+
+
+def _load_index(filepath, search_cols, rebuild=False, tokenizer=None):
+    """Load rows and BM25 for a CSV from its binary index, refitting only when the CSV changed
+
+    A stale index is patched with BM25.refit(), so only added, edited or
+    removed rows are tokenized and have their terms' postings rebuilt;
+    rebuild=True refits from scratch.
+    """
+    index_file = _index_path(filepath)
+    previous = None
+    if not rebuild:
+        with profile_stage("index_load"):
+            mapped = _open_binary_index(index_file, filepath, search_cols, tokenizer, stale_ok=True)
+        if mapped is not None:
+            rows, previous = mapped
+            if rows.source == _file_version(filepath):
+                profile_count("index_file_hits")
+                return mapped
+
+    with profile_stage("csv_load"):
+        stat = filepath.stat()
+        digest = _file_hash(filepath)
+        fieldnames, documents, row_offsets = _scan_csv(filepath, search_cols)
+
+    with profile_stage("fit"):
+        if previous is not None:
+            bm25 = previous.refit(documents)
+        else:
+            bm25 = BM25(tokenizer=tokenizer)
+            bm25.fit(documents)
+    profile_count("index_updates" if previous is not None else "index_builds")
+
+    with profile_stage("index_write"):
+        _write_binary_index(index_file, bm25, fieldnames, row_offsets, (stat.st_size, stat.st_mtime_ns, digest), search_cols)
+    return CsvRows(filepath, fieldnames, row_offsets, (stat.st_size, stat.st_mtime_ns)), bm25
+
+
+def build_indexes(rebuild=False):
+    """Compile binary indexes for every domain and stack CSV; returns {file: "built" | "updated" | "fresh"}
+
+    Stale indexes are refitted incrementally unless rebuild is set.
+    """
+    sources = [(config["file"], config["search_cols"], _config_tokenizer(config)) for config in CSV_CONFIG.values()]
+    sources += [(config["file"], _STACK_COLS["search_cols"], _config_tokenizer(config)) for config in STACK_CONFIG.values()]
+    status = {}
+    for file, search_cols, tokenizer in sources:
+        filepath = DATA_DIR / file
+        if not filepath.exists():
+            continue
+        if not rebuild and _open_binary_index(_index_path(filepath), filepath, search_cols, tokenizer) is not None:
+            status[file] = "fresh"
+            continue
+        existed = _index_path(filepath).exists()
+        _load_index(filepath, search_cols, rebuild=rebuild, tokenizer=tokenizer)
+        status[file] = "updated" if existed and not rebuild else "built"
+    invalidate_index()
+    return status
+
+
+# ============ INDEX REGISTRY ============
+# Loaded indexes keyed by (CSV path, search columns, tokenizer); shared by search(),
+# search_stack() and the design system generator for the process lifetime.
+_INDEX_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+_BUILD_LOCKS = {}  # Per-key locks so different CSVs can load concurrently
+
+
+def _config_tokenizer(config):
+    """Tokenizer for a CSV_CONFIG / STACK_CONFIG entry"""
+    return get_tokenizer(config.get("tokenizer"))
+
+
+def get_index(filepath, search_cols, tokenizer=None):
+    """Return (rows, bm25) for a CSV, loading and fitting it at most once per process"""
+    tokenizer = tokenizer or get_tokenizer()
+    key = (str(filepath), tuple(search_cols), tokenizer.signature)
+    index = _INDEX_REGISTRY.get(key)
+    if index is None:
+        with _REGISTRY_LOCK:
+            build_lock = _BUILD_LOCKS.setdefault(key, threading.Lock())
+        with build_lock:
+            index = _INDEX_REGISTRY.get(key)
+            if index is None:
+                index = _load_index(filepath, search_cols, tokenizer=tokenizer)
+                with _REGISTRY_LOCK:
+                    _INDEX_REGISTRY[key] = index
+    else:
+        profile_count("index_registry_hits")
+
+    stats = _ACTIVE_STATS.get()
+    if stats is not None:
+        stats.corpus[Path(filepath).name] = index[1].N
+    return index
+
+
+def invalidate_index(filepath=None):
+    """Drop registered indexes for one CSV path, or all of them when omitted"""
+    with _REGISTRY_LOCK:
+        if filepath is None:
+            _INDEX_REGISTRY.clear()
+            query_cache.clear()
+            return
+        for key in [k for k in _INDEX_REGISTRY if k[0] == str(filepath)]:
+            del _INDEX_REGISTRY[key]
+    query_cache.invalidate(filepath)
+
+
+def preload_indexes(domains=None, stacks=None):
+    """Warm the registry for the given domains/stacks (all when omitted)"""
+    for domain in (CSV_CONFIG if domains is None else domains):
+        config = CSV_CONFIG[domain]
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            get_index(filepath, config["search_cols"], _config_tokenizer(config))
+    for stack in (STACK_CONFIG if stacks is None else stacks):
+        filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
+        if filepath.exists():
+            get_index(filepath, _STACK_COLS["search_cols"], _config_tokenizer(STACK_CONFIG[stack]))
+
+
+def refresh_indexes():
+    """Refit loaded indexes whose CSV changed on disk; returns the refreshed CSV paths
+
+    Refits are incremental (see _load_index), so an edited row is searchable
+    again after re-tokenizing just that row.
+    """
+    with _REGISTRY_LOCK:
+        loaded = list(_INDEX_REGISTRY.items())
+
+    refreshed = []
+    for (path, search_cols, _), (rows, bm25) in loaded:
+        version = _file_version(path)
+        if version is None or version == rows.source:
+            continue
+        invalidate_index(path)
+        get_index(Path(path), search_cols, bm25.tokenizer)
+        refreshed.append(path)
+    return refreshed
+
+
+# ============ QUERY CACHE ============
+def _file_version(filepath):
+    """(size, mtime_ns) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class QueryCache:
+    """Thread-safe LRU cache of ranked result lists with optional TTL
+
+    Keys start with the CSV path; each entry remembers the CSV version it was
+    computed from and is dropped on lookup once the file has changed.
+    """
+
+    def __init__(self, maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (version, expires_at, results)
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        """Cached results for key computed from this CSV version, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                cached_version, expires_at, results = entry
+                if cached_version == version and (expires_at is None or time.monotonic() < expires_at):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return results
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, results):
+        """Store results for key, evicting the least recently used entries over maxsize"""
+        if not self.maxsize:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (version, expires_at, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, filepath):
+        """Drop every entry computed from one CSV"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == str(filepath)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters and hit rate as a dict"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+query_cache = QueryCache()
+_QUERY_WORDS = Tokenizer(min_length=1)
+
+
+def normalize_query(query):
+    """Lowercased query words; queries that normalize equally rank identically under any Tokenizer"""
+    return _QUERY_WORDS(query)
+
+
+def _cache_key(filepath, search_cols, output_cols, query, max_results, tokenizer, weights=None):
+    """Query cache key: CSV, columns, query tokens, result limit and BM25F field weights"""
+    return (str(filepath), tuple(search_cols), tuple(output_cols), tokenizer.signature, tokenizer(query), max_results,
+            weights)
+
+
+def _field_weights(search_cols, config, boosts=None):
+    """BM25F weight per search column: the entry's "field_weights" times query boosts; None for plain BM25"""
+    weights = config.get("field_weights") or {}
+    if not weights and not boosts:
+        return None
+    boosts = boosts or {}
+    unknown = [field for field in boosts if field not in search_cols]
+    if unknown:
+        raise ValueError(f"Unknown field: {', '.join(unknown)}. Searchable: {', '.join(search_cols)}")
+    invalid = [f"{field}={weight}" for field, weight in boosts.items() if not (isfinite(weight) and weight > 0)]
+    if invalid:
+        raise ValueError(f"Boosts must be finite and positive: {', '.join(invalid)}")
+    return tuple(weights.get(col, 1.0) * boosts.get(col, 1.0) for col in search_cols)
+
+
+# ============ RESULT STREAMS ============
+class _HitStream:
+    """One query's ranking, popped lazily from BM25.iter_score() and kept for paging"""
+
+    def __init__(self, key, bm25, query, weights=None):
+        self.key = key
+        self.bm25 = bm25
+        self.hits = []  # (doc index, score) ranked so far
+        self._ranking = bm25.iter_score(query, weights)
+        self._lock = threading.Lock()
+
+    def take(self, offset, count):
+        """Hits [offset, offset + count), ranking only as far as needed"""
+        with self._lock:
+            missing = offset + count - len(self.hits)
+            if missing > 0 and self._ranking is not None:
+                ranked = list(islice(self._ranking, missing))
+                self.hits.extend(hit for hit in ranked if hit[1] > 0)
+                if len(ranked) < missing or ranked[-1][1] <= 0:
+                    self._ranking = None  # Exhausted: nothing below a non-positive score is a match
+            return self.hits[offset:offset + count]
+
+
+_STREAMS = OrderedDict()  # stream id -> _HitStream, least recently used first
+_STREAMS_LOCK = threading.Lock()
+
+
+def _query_digest(key):
+    """Short hex digest of a stream key, carried in cursors to tie them to their query"""
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def _parse_cursor(cursor):
+    """(stream id, query digest, offset) of a cursor from search_page(), or (None, None, 0) to start over"""
+    if not cursor:
+        return None, None, 0
+    parts = str(cursor).split("-")
+    if len(parts) != 3 or not all(parts) or not parts[2].isdigit():
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return parts[0], parts[1], int(parts[2])
+
+
+def _search_page(filepath, search_cols, output_cols, query, page_size, cursor, tokenizer, weights=None):
+    """(rows, next cursor or None, offset) of one page, continuing the cursor's ranking when it is still loaded
+
+    A cursor whose stream was evicted, belongs to another process or was
+    ranked on an index that has since been reloaded is honoured by ranking
+    again and skipping to its offset. Cursors carry a digest of their query,
+    so one from a different query is rejected even then.
+    """
+    if page_size < 1:
+        raise ValueError(f"Page size must be at least 1, got {page_size}")
+    stream_id, digest, offset = _parse_cursor(cursor)
+    key = (str(filepath), tuple(search_cols), tokenizer.signature, tokenizer(query), weights)
+    if digest is not None and digest != _query_digest(key):
+        raise ValueError("Cursor belongs to a different query")
+
+    def run():
+        data, bm25 = get_index(filepath, search_cols, tokenizer)
+        with _STREAMS_LOCK:
+            stream = _STREAMS.get(stream_id)
+            if stream is not None and stream.key != key:
+                raise ValueError("Cursor belongs to a different query")
+            if stream is not None and stream.bm25 is bm25:
+                page_stream_id = stream_id
+                profile_count("stream_hits")
+            else:
+                page_stream_id = os.urandom(6).hex()
+                stream = _STREAMS[page_stream_id] = _HitStream(key, bm25, query, weights)
+                while len(_STREAMS) > STREAM_CACHE_SIZE:
+                    _STREAMS.popitem(last=False)
+            _STREAMS.move_to_end(page_stream_id)
+
+        with profile_stage("score"):
+            hits = stream.take(offset, page_size + 1)  # One extra hit tells whether a next page exists
+        with profile_stage("rows"):
+            results = _collect_results(data, hits[:page_size], output_cols)
+        next_cursor = f"{page_stream_id}-{_query_digest(key)}-{offset + page_size}" if len(hits) > page_size else None
+        return results, next_cursor, offset
+
+    return _retry_if_stale(run)
+
+
+# ============ KEYWORD MATCHING ============
+class KeywordMatcher:
+    """Aho-Corasick automaton over a {category: [keywords]} table
+
+    match() finds every category's keywords in one pass over the text,
+    whatever the number of keywords. Keywords match as case-insensitive
+    substrings, like `keyword in text.lower()`, overlapping ones included.
+    """
+
+    __slots__ = ("categories", "_goto", "_fail", "_out")
+
+    def __init__(self, table):
+        self.categories = list(table)
+        goto = [{}]  # node -> {char: child node}; node 0 is the root
+        out = [[]]   # node -> [(category index, keyword entry), ...] of keywords ending there
+        entry = 0
+        for category, keywords in enumerate(table.values()):
+            for keyword in keywords:
+                node = 0
+                for char in keyword.lower():
+                    child = goto[node].get(char)
+                    if child is None:
+                        child = goto[node][char] = len(goto)
+                        goto.append({})
+                        out.append([])
+                    node = child
+                out[node].append((category, entry))
+                entry += 1
+
+        # Failure links breadth-first; a node also reports the keywords of its failure node
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                target = fail[node]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                fail[child] = goto[target].get(char, 0)
+                out[child] = out[child] + out[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def match(self, text):
+        """{category: number of its keywords found in text}, in table order; categories without hits are left out"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(out[0])  # Empty keywords match any text
+        node = 0
+        for char in text.lower():
+            step = goto[node].get(char)
+            if step is None:
+                # Follow failure links once, then remember the transition
+                target = node
+                while target and char not in goto[target]:
+                    target = fail[target]
+                step = goto[node][char] = goto[target].get(char, 0)
+            node = step
+            if out[node]:
+                found.update(out[node])
+        counts = Counter(category for category, _ in found)
+        return {self.categories[category]: counts[category] for category in sorted(counts)}
+
+
+_DOMAIN_MATCHER = KeywordMatcher(DOMAIN_KEYWORDS)
+
+
+# ============ SEARCH FUNCTIONS ============
+def _search_csv(filepath, search_cols, output_cols, query, max_results, tokenizer=None, weights=None):
+    """Core search function using BM25 (BM25F with field weights); repeated queries are served from query_cache"""
+    version = _file_version(filepath)
+    if version is None:
         return []
 
-    data = _load_csv(filepath)
+    tokenizer = tokenizer or get_tokenizer()
+    with profile_stage("tokenize"):
+        key = _cache_key(filepath, search_cols, output_cols, query, max_results, tokenizer, weights)
+    results = query_cache.get(key, version)
+    if results is None:
+        profile_count("query_cache_misses")
+
+        def run():
+            data, bm25 = get_index(filepath, search_cols, tokenizer)
+            with profile_stage("score"):
+                if weights is None:
+                    ranked = bm25.score(query, max_results)
+                else:
+                    ranked = bm25.score_fields(query, weights, max_results)
+            with profile_stage("rows"):
+                return _collect_results(data, ranked, output_cols)
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+        results = _retry_if_stale(run)
+        query_cache.put(key, version, results)
+    else:
+        profile_count("query_cache_hits")
+    return [dict(row) for row in results]
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+def _collect_results(data, ranked, output_cols):
+    """Decode top result rows with score > 0, limited to output columns"""
+    return data.materialize([idx for idx, score in ranked if score > 0], output_cols)
 
-    return results
+
+def _retry_if_stale(func):
+    """Run func(); if a CSV changed under its loaded index, reload and run it once more"""
+    try:
+        return func()
+    except _StaleRowsError as e:
+        invalidate_index(e.filepath)
+        return func()
 
 
 def detect_domain(query):
-    """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
+    """Auto-detect the most relevant domain from query: most DOMAIN_KEYWORDS hits, earliest domain on ties"""
+    scores = _DOMAIN_MATCHER.match(query)
+    return max(scores, key=scores.get) if scores else "style"
 
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "style"
 
+def search(query, domain=None, max_results=MAX_RESULTS, boosts=None):
+    """Main search function with auto-domain detection
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+    boosts: {search column: weight multiplier} for this query; ranks with
+    BM25F, e.g. {"Style Category": 3.0} to prefer matches in style names.
+    """
     if domain is None:
         domain = detect_domain(query)
 
@@ -220,7 +1522,12 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    try:
+        weights = _field_weights(config["search_cols"], config, boosts)
+    except ValueError as e:
+        return {"error": str(e), "domain": domain}
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results,
+                          _config_tokenizer(config), weights)
 
     return {
         "domain": domain,
@@ -231,6 +1538,65 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     }
 
 
+def search_page(query, domain=None, page_size=MAX_RESULTS, cursor=None, boosts=None):
+    """One page of search() results plus a "cursor" for the next page (None after the last)
+
+    Pages after the first continue the stored ranking instead of scoring
+    the query again; cursors are opaque strings.
+    """
+    if domain is None:
+        domain = detect_domain(query)
+
+    config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
+    filepath = DATA_DIR / config["file"]
+
+    if not filepath.exists():
+        return {"error": f"File not found: {filepath}", "domain": domain}
+
+    try:
+        weights = _field_weights(config["search_cols"], config, boosts)
+        results, next_cursor, offset = _search_page(filepath, config["search_cols"], config["output_cols"], query,
+                                                    page_size, cursor, _config_tokenizer(config), weights)
+    except ValueError as e:
+        return {"error": str(e), "domain": domain}
+
+    return {
+        "domain": domain,
+        "query": query,
+        "file": config["file"],
+        "offset": offset,
+        "count": len(results),
+        "results": results,
+        "cursor": next_cursor
+    }
+
+
+def iter_search(query, domain=None, cursor=None, batch_size=MAX_RESULTS, boosts=None):
+    """Yield search() result rows best first, ranking and decoding batch_size rows at a time
+
+    Starts after cursor (from search_page()) when given. Raises
+    FileNotFoundError for a missing CSV and ValueError for a bad cursor or
+    a batch_size below 1.
+    """
+    if domain is None:
+        domain = detect_domain(query)
+
+    config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
+    filepath = DATA_DIR / config["file"]
+
+    if not filepath.exists():
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    tokenizer = _config_tokenizer(config)
+    weights = _field_weights(config["search_cols"], config, boosts)
+    while True:
+        results, cursor, _ = _search_page(filepath, config["search_cols"], config["output_cols"], query,
+                                          batch_size, cursor, tokenizer, weights)
+        yield from results
+        if cursor is None:
+            return
+
+
 def search_stack(query, stack, max_results=MAX_RESULTS):
     """Search stack-specific guidelines"""
     if stack not in STACK_CONFIG:
@@ -241,7 +1607,8 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results,
+                          _config_tokenizer(STACK_CONFIG[stack]), _field_weights(_STACK_COLS["search_cols"], STACK_CONFIG[stack]))
 
     return {
         "domain": "stack",
@@ -251,3 +1618,108 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+def search_many(queries, domain=None, max_results=MAX_RESULTS):
+    """Run search() for many queries; queries sharing a domain are scored in one batch"""
+    by_domain = defaultdict(list)
+    for pos, query in enumerate(queries):
+        by_domain[domain if domain is not None else detect_domain(query)].append(pos)
+
+    responses = [None] * len(queries)
+    for query_domain, positions in by_domain.items():
+        config = CSV_CONFIG.get(query_domain, CSV_CONFIG["style"])
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            for pos in positions:
+                responses[pos] = {"error": f"File not found: {filepath}", "domain": query_domain}
+            continue
+
+        # Serve repeated queries from the cache and batch-score the rest
+        version = _file_version(filepath)
+        tokenizer = _config_tokenizer(config)
+        weights = _field_weights(config["search_cols"], config)
+        keys = {pos: _cache_key(filepath, config["search_cols"], config["output_cols"], queries[pos], max_results, tokenizer,
+                                weights)
+                for pos in positions}
+        found = {}
+        for pos in positions:
+            cached = query_cache.get(keys[pos], version)
+            if cached is not None:
+                found[pos] = cached
+        missing = [pos for pos in positions if pos not in found]
+
+        profile_count("query_cache_hits", len(found))
+        profile_count("query_cache_misses", len(missing))
+
+        def run():
+            data, bm25 = get_index(filepath, config["search_cols"], tokenizer)
+            with profile_stage("score"):
+                if weights is None:
+                    rankings = bm25.score_many([queries[pos] for pos in missing], max_results)
+                else:
+                    rankings = [bm25.score_fields(queries[pos], weights, max_results) for pos in missing]
+            with profile_stage("rows"):
+                return [_collect_results(data, ranked, config["output_cols"]) for ranked in rankings]
+
+        if missing:
+            for pos, results in zip(missing, _retry_if_stale(run)):
+                query_cache.put(keys[pos], version, results)
+                found[pos] = results
+
+        for pos in positions:
+            results = [dict(row) for row in found[pos]]
+            responses[pos] = {
+                "domain": query_domain,
+                "query": queries[pos],
+                "file": config["file"],
+                "count": len(results),
+                "results": results
+            }
+    return responses
+
+
+def search_domains(query, limits):
+    """search() across several domains at once; limits maps domain -> max_results
+
+    The query is tokenized once per distinct tokenizer and scored against
+    each domain's loaded index, so rankings match search() for that domain.
+    Domains ranked with BM25F ("field_weights") are searched one by one.
+    """
+    query_tokens = {}  # Tokenizer -> tokens of query
+    responses = {}
+    for domain, top_k in limits.items():
+        config = CSV_CONFIG.get(domain)
+        if config is None:
+            responses[domain] = {"error": f"Unknown domain: {domain}", "domain": domain}
+            continue
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            responses[domain] = {"error": f"File not found: {filepath}", "domain": domain}
+            continue
+        if config.get("field_weights"):
+            responses[domain] = search(query, domain, top_k)
+            continue
+
+        tokenizer = _config_tokenizer(config)
+        with profile_stage("tokenize"):
+            tokens = query_tokens.get(tokenizer)
+            if tokens is None:
+                tokens = query_tokens[tokenizer] = tokenizer(query)
+
+        def run():
+            data, bm25 = get_index(filepath, config["search_cols"], tokenizer)
+            with profile_stage("score"):
+                ranked = bm25.score_tokens(tokens, top_k)
+            with profile_stage("rows"):
+                return _collect_results(data, ranked, config["output_cols"])
+
+        results = _retry_if_stale(run)
+        responses[domain] = {
+            "domain": domain,
+            "query": query,
+            "file": config["file"],
+            "count": len(results),
+            "results": results
+        }
+    return responses
@@ -13,32 +13,123 @@ Usage:
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
 """
 
+import contextvars
+import copy
 import csv
+import hashlib
 import json
 import os
+import re
+import threading
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+from core import (build_indexes, normalize_query, preload_indexes, profile_count, profile_stage,
+                  search, search_domains, KeywordMatcher, QueryCache, CSV_CONFIG, DATA_DIR)
 
 
 # ============ CONFIGURATION ============
 REASONING_FILE = "ui-reasoning.csv"
+GENERATE_CACHE_SIZE = 128  # Memoized design systems (and formatted outputs) per generator
 
 SEARCH_CONFIG = {
     "product": {"max_results": 1},
-    "style": {"max_results": 3},
-    "color": {"max_results": 2},
-    "landing": {"max_results": 2},
-    "typography": {"max_results": 2}
+    "style": {"max_results": 1},
+    "color": {"max_results": 1},
+    "landing": {"max_results": 1},
+    "typography": {"max_results": 1}
 }
 
+# Style search: BM25F field boosts, and how often the first / second style priority
+# of the reasoning rule is repeated in the query so earlier priorities outweigh later ones
+STYLE_FIELD_BOOSTS = {"Style Category": 5.0, "Keywords": 2.0}
+STYLE_PRIORITY_REPEATS = (3, 1)
+
+# Page override routing: keyword substrings per page type, checked in this order
+PAGE_TYPE_KEYWORDS = {
+    "Dashboard / Data View": ["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"],
+    "Checkout / Payment": ["checkout", "payment", "cart", "purchase", "order", "billing"],
+    "Settings / Profile": ["settings", "profile", "account", "preferences", "config"],
+    "Landing / Marketing": ["landing", "marketing", "homepage", "hero", "home", "promo"],
+    "Authentication": ["login", "signin", "signup", "register", "auth", "password"],
+    "Pricing / Plans": ["pricing", "plans", "subscription", "tiers", "packages"],
+    "Blog / Article": ["blog", "article", "post", "news", "content", "story"],
+    "Product Detail": ["product", "item", "detail", "pdp", "shop", "store"],
+    "Search Results": ["search", "results", "browse", "filter", "catalog", "list"],
+    "Empty State": ["empty", "404", "error", "not found", "zero"]
+}
+# Fallback page type from the matched style's "Best For"
+STYLE_PAGE_TYPE_KEYWORDS = {
+    "Dashboard / Data View": ["dashboard", "data"],
+    "Landing / Marketing": ["landing", "marketing"]
+}
+# Page layout density from the matched style's "Keywords", checked in this order
+LAYOUT_DENSITY_KEYWORDS = {
+    "dense": ["data", "dense", "dashboard", "grid"],
+    "minimal": ["minimal", "simple", "clean", "single"]
+}
+
+# "**Generated:** <timestamp>" line of persisted files, ignored when checking them for changes
+GENERATED_LINE = re.compile(r"^(> )?\*\*Generated:\*\* .*$", re.MULTILINE)
+
+_PAGE_TYPE_MATCHER = KeywordMatcher(PAGE_TYPE_KEYWORDS)
+_STYLE_PAGE_TYPE_MATCHER = KeywordMatcher(STYLE_PAGE_TYPE_KEYWORDS)
+_LAYOUT_DENSITY_MATCHER = KeywordMatcher(LAYOUT_DENSITY_KEYWORDS)
+
 
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
-    """Generates design system recommendations from aggregated searches."""
+    """Generates design system recommendations from aggregated searches.
 
-    def __init__(self):
+    executor: None searches the domains in turn, tokenizing the query once;
+    "thread" or "process" (or any executor with submit()) fans the per-domain
+    searches out to a pool, overlapping CSV I/O and index builds on cold
+    indexes. Pools created here are shut down by close(). Searches in thread
+    pools are recorded by an active profiling(); process pool workers are not.
+
+    generate() and render() are memoized by normalized query until the
+    domain CSVs change (cache_size=0 disables this); get_generator()
+    returns a shared instance.
+    """
+
+    def __init__(self, executor=None, max_workers: int = None, cache_size: int = GENERATE_CACHE_SIZE):
         self.reasoning_data = self._load_reasoning()
+        self._build_reasoning_index()
+        self._data_files = [DATA_DIR / CSV_CONFIG[domain]["file"] for domain in SEARCH_CONFIG]
+        self._generated = QueryCache(maxsize=cache_size)  # query tokens -> design system
+        self._rendered = QueryCache(maxsize=cache_size)   # (tokens, name, format) -> text
+        self._owns_pool = executor in ("thread", "process")
+        self._copy_context = executor == "thread"  # Run tasks in the caller's context (profiling stats)
+        if executor == "thread":
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=max_workers or len(SEARCH_CONFIG))
+        elif executor == "process":
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=max_workers or len(SEARCH_CONFIG))
+        elif executor is None or hasattr(executor, "submit"):
+            self._pool = executor
+            if executor is not None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._copy_context = isinstance(executor, ThreadPoolExecutor)
+        else:
+            raise ValueError(f"Unknown executor: {executor!r} (expected 'thread', 'process' or an executor with submit())")
+
+    def _submit(self, func, *args):
+        """Submit func(*args) to the pool, inside a copy of the current context for thread pools."""
+        if self._copy_context:
+            return self._pool.submit(contextvars.copy_context().run, func, *args)
+        return self._pool.submit(func, *args)
+
+    def close(self):
+        """Shut down a pool created by this generator."""
+        if self._owns_pool and self._pool is not None:
+            self._pool.shutdown()
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
@@ -48,48 +139,125 @@ class DesignSystemGenerator:
         with open(filepath, 'r', encoding='utf-8') as f:
             return list(csv.DictReader(f))
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
+    def _multi_domain_search(self, query: str, style_priority: list = None, prefetched: dict = None) -> dict:
+        """Execute searches across multiple domains.
+
+        Style is ranked with BM25F: the style priorities join the query and
+        matches in style names and keywords are boosted, so the top hit is
+        already the best priority match. Without a pool the other domains
+        share one tokenization of the query (search_domains). With a pool,
+        each domain is a separate task. prefetched maps domains to results
+        (or futures) that are already available; they are not searched again.
+        """
+        style_query = f"{query} {_priority_query(style_priority or [])}".strip()
+        style_limit = SEARCH_CONFIG["style"]["max_results"]
+
+        pending = dict(prefetched or {})
+        if self._pool is None:
+            limits = {domain: config["max_results"] for domain, config in SEARCH_CONFIG.items()
+                      if domain != "style" and domain not in pending}
+            results = {**pending, **search_domains(query, limits)}
+            results["style"] = search(style_query, "style", style_limit, STYLE_FIELD_BOOSTS)
+            return results
+
         for domain, config in SEARCH_CONFIG.items():
-            if domain == "style" and style_priority:
-                # For style, also search with priority keywords
-                priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
-            else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+            if domain == "style":
+                pending[domain] = self._submit(search, style_query, domain, style_limit, STYLE_FIELD_BOOSTS)
+            elif domain not in pending:
+                pending[domain] = self._submit(search, query, domain, config["max_results"])
+        return {
+            domain: result.result() if hasattr(result, "result") else result
+            for domain, result in pending.items()
+        }
 
-    def _find_reasoning_rule(self, category: str) -> dict:
-        """Find matching reasoning rule for a category."""
+    def _prefetch_searches(self, query: str) -> dict:
+        """Start searches for domains that don't depend on the product category."""
+        return {
+            domain: self._submit(search, query, domain, config["max_results"])
+            for domain, config in SEARCH_CONFIG.items()
+            if domain not in ("product", "style")
+        }
+
+    def _build_reasoning_index(self):
+        """Precompute reasoning rule lookup tables and parsed rule payloads."""
+        self._rule_categories = []   # Lowercased UI_Category per rule
+        self._rule_keywords = []     # UI_Category keywords per rule
+        self._exact_rules = {}       # Lowercased UI_Category -> first rule index
+        self._keyword_rules = {}     # Keyword -> first rule index containing it
+        self._rule_payloads = []     # _apply_reasoning() output per rule
+        self._rule_lookup = {}       # Memo: lowercased category -> rule index (or None)
+
+        for idx, rule in enumerate(self.reasoning_data):
+            ui_cat = rule.get("UI_Category", "").lower()
+            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
+            self._rule_categories.append(ui_cat)
+            self._rule_keywords.append(keywords)
+            self._exact_rules.setdefault(ui_cat, idx)
+            for kw in keywords:
+                self._keyword_rules.setdefault(kw, idx)
+
+            # Parse decision rules JSON
+            decision_rules = {}
+            try:
+                decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
+            except json.JSONDecodeError:
+                pass
+
+            self._rule_payloads.append({
+                "pattern": rule.get("Recommended_Pattern", ""),
+                "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
+                "color_mood": rule.get("Color_Mood", ""),
+                "typography_mood": rule.get("Typography_Mood", ""),
+                "key_effects": rule.get("Key_Effects", ""),
+                "anti_patterns": rule.get("Anti_Patterns", ""),
+                "decision_rules": decision_rules,
+                "severity": rule.get("Severity", "MEDIUM")
+            })
+
+    def _find_rule_index(self, category: str):
+        """Index of the matching reasoning rule for a category, or None."""
         category_lower = category.lower()
+        if category_lower in self._rule_lookup:
+            return self._rule_lookup[category_lower]
 
         # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
+        idx = self._exact_rules.get(category_lower)
 
         # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
+        if idx is None:
+            for pos, ui_cat in enumerate(self._rule_categories):
+                if ui_cat in category_lower or category_lower in ui_cat:
+                    idx = pos
+                    break
+
+        # Try keyword match: a whole-token hit from the keyword index is a match,
+        # so only earlier rules need the substring check
+        if idx is None:
+            tokens = category_lower.replace("/", " ").replace("-", " ").split()
+            bound = min((self._keyword_rules[t] for t in tokens if t in self._keyword_rules), default=None)
+            for pos in range(len(self._rule_keywords) if bound is None else bound):
+                if any(kw in category_lower for kw in self._rule_keywords[pos]):
+                    idx = pos
+                    break
+            else:
+                idx = bound
 
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
+        if len(self._rule_lookup) >= 4096:
+            self._rule_lookup.clear()
+        self._rule_lookup[category_lower] = idx
+        return idx
 
-        return {}
+    def _find_reasoning_rule(self, category: str) -> dict:
+        """Find matching reasoning rule for a category."""
+        idx = self._find_rule_index(category)
+        return self.reasoning_data[idx] if idx is not None else {}
 
+    @profile_stage("reasoning")
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
+        idx = self._find_rule_index(category)
 
-        if not rule:
+        if idx is None:
             return {
                 "pattern": "Hero + Features + CTA",
                 "style_priority": ["Minimalism", "Flat Design"],
@@ -101,67 +269,86 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
+        # Copy mutable parts so callers can't alter the precomputed payload
+        payload = self._rule_payloads[idx]
+        decision_rules = payload["decision_rules"]
         return {
-            "pattern": rule.get("Recommended_Pattern", ""),
-            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
-            "color_mood": rule.get("Color_Mood", ""),
-            "typography_mood": rule.get("Typography_Mood", ""),
-            "key_effects": rule.get("Key_Effects", ""),
-            "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
-            "severity": rule.get("Severity", "MEDIUM")
+            **payload,
+            "style_priority": list(payload["style_priority"]),
+            "decision_rules": dict(decision_rules) if isinstance(decision_rules, dict) else decision_rules
         }
 
-    def _select_best_match(self, results: list, priority_keywords: list) -> dict:
-        """Select best matching result based on priority keywords."""
-        if not results:
-            return {}
-
-        if not priority_keywords:
-            return results[0]
-
-        # First: try exact style name match
-        for priority in priority_keywords:
-            priority_lower = priority.lower().strip()
-            for result in results:
-                style_name = result.get("Style Category", "").lower()
-                if priority_lower in style_name or style_name in priority_lower:
-                    return result
-
-        # Second: score by keyword match in all fields
-        scored = []
-        for result in results:
-            result_str = str(result).lower()
-            score = 0
-            for kw in priority_keywords:
-                kw_lower = kw.lower().strip()
-                # Higher score for style name match
-                if kw_lower in result.get("Style Category", "").lower():
-                    score += 10
-                # Lower score for keyword field match
-                elif kw_lower in result.get("Keywords", "").lower():
-                    score += 3
-                # Even lower for other field matches
-                elif kw_lower in result_str:
-                    score += 1
-            scored.append((score, result))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return scored[0][1] if scored and scored[0][0] > 0 else results[0]
-
     def _extract_results(self, search_result: dict) -> list:
         """Extract results list from search result dict."""
         return search_result.get("results", [])
 
+    def _data_version(self) -> tuple:
+        """Size and mtime of each domain CSV, so data edits invalidate memoized results."""
+        versions = []
+        for filepath in self._data_files:
+            try:
+                stat = filepath.stat()
+            except OSError:
+                versions.append(None)
+            else:
+                versions.append((stat.st_size, stat.st_mtime_ns))
+        return tuple(versions)
+
+    def cache_stats(self) -> dict:
+        """Hit/miss/eviction counters of the generate() and render() caches."""
+        return {"generated": self._generated.stats(), "rendered": self._rendered.stats()}
+
     def generate(self, query: str, project_name: str = None) -> dict:
-        """Generate complete design system recommendation."""
+        """Generate complete design system recommendation.
+
+        Results are memoized by normalized query. The project name only sets
+        the header, so projects sharing a brief reuse one generation.
+        """
+        key = normalize_query(query)
+        version = self._data_version()
+        design_system = self._generated.get(key, version)
+        if design_system is None:
+            profile_count("design_system_cache_misses")
+            design_system = self._generate(query)
+            self._generated.put(key, version, design_system)
+        else:
+            profile_count("design_system_cache_hits")
+        design_system = copy.deepcopy(design_system)
+        design_system["project_name"] = project_name or query.upper()
+        return design_system
+
+    def render(self, query: str, project_name: str = None, output_format: str = "ascii") -> str:
+        """Generate and format a design system ("ascii", "markdown" or "master"), memoizing the text.
+
+        "master" embeds the current time, so it is formatted on every call
+        (the design system itself is still memoized).
+        """
+        formatters = {"ascii": format_ascii_box, "markdown": format_markdown, "master": format_master_md}
+        if output_format not in formatters:
+            raise ValueError(f"Unknown output format: {output_format!r} (expected one of {', '.join(formatters)})")
+        if output_format == "master":
+            design_system = self.generate(query, project_name)
+            with profile_stage("format"):
+                return format_master_md(design_system)
+
+        key = (normalize_query(query), project_name or query.upper(), output_format)
+        version = self._data_version()
+        output = self._rendered.get(key, version)
+        if output is None:
+            profile_count("render_cache_misses")
+            design_system = self.generate(query, project_name)
+            with profile_stage("format"):
+                output = formatters[output_format](design_system)
+            self._rendered.put(key, version, output)
+        else:
+            profile_count("render_cache_hits")
+        return output
+
+    def _generate(self, query: str) -> dict:
+        """Run the searches and reasoning for one query (project_name left unset)."""
+        # With a pool, domains independent of the product category start now
+        prefetched = self._prefetch_searches(query) if self._pool is not None else {}
+
         # Step 1: First search product to get category
         product_result = search(query, "product", 1)
         product_results = product_result.get("results", [])
@@ -174,19 +361,21 @@ class DesignSystemGenerator:
         style_priority = reasoning.get("style_priority", [])
 
         # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
-
-        # Step 4: Select best matches from each domain using priority
-        style_results = self._extract_results(search_results.get("style", {}))
-        color_results = self._extract_results(search_results.get("color", {}))
-        typography_results = self._extract_results(search_results.get("typography", {}))
-        landing_results = self._extract_results(search_results.get("landing", {}))
-
-        best_style = self._select_best_match(style_results, reasoning.get("style_priority", []))
-        best_color = color_results[0] if color_results else {}
-        best_typography = typography_results[0] if typography_results else {}
-        best_landing = landing_results[0] if landing_results else {}
+        prefetched["product"] = product_result  # Reuse product search
+        search_results = self._multi_domain_search(query, style_priority, prefetched)
+        search_results["product"] = product_result
+
+        # Step 4: Best match per domain (style priorities were applied while ranking)
+        with profile_stage("select"):
+            style_results = self._extract_results(search_results.get("style", {}))
+            color_results = self._extract_results(search_results.get("color", {}))
+            typography_results = self._extract_results(search_results.get("typography", {}))
+            landing_results = self._extract_results(search_results.get("landing", {}))
+
+            best_style = style_results[0] if style_results else {}
+            best_color = color_results[0] if color_results else {}
+            best_typography = typography_results[0] if typography_results else {}
+            best_landing = landing_results[0] if landing_results else {}
 
         # Step 5: Build final recommendation
         # Combine effects from both reasoning and style search
@@ -195,7 +384,7 @@ class DesignSystemGenerator:
         combined_effects = style_effects if style_effects else reasoning_effects
 
         return {
-            "project_name": project_name or query.upper(),
+            "project_name": None,
             "category": category,
             "pattern": {
                 "name": best_landing.get("Pattern Name", reasoning.get("pattern", "Hero + Features + CTA")),
@@ -236,6 +425,11 @@ class DesignSystemGenerator:
         }
 
 
+def _priority_query(style_priority: list) -> str:
+    """Query text for the top style priorities, each repeated per STYLE_PRIORITY_REPEATS."""
+    return " ".join(" ".join([priority] * repeats) for priority, repeats in zip(style_priority, STYLE_PRIORITY_REPEATS))
+
+
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
@@ -459,8 +653,23 @@ def format_markdown(design_system: dict) -> str:
 
 
 # ============ MAIN ENTRY POINT ============
+_shared_generator = None
+_shared_generator_lock = threading.Lock()
+
+
+def get_generator() -> DesignSystemGenerator:
+    """Process-wide generator, so reasoning rules and memoized results are reused across calls."""
+    global _shared_generator
+    if _shared_generator is None:
+        with _shared_generator_lock:
+            if _shared_generator is None:
+                _shared_generator = DesignSystemGenerator()
+    return _shared_generator
+
+
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           executor: str = None, persisted: dict = None) -> str:
     """
     Main entry point for design system generation.
 
@@ -471,23 +680,118 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
+        executor: Optional "thread" or "process" pool for the per-domain searches
+        persisted: Optional dict that receives the persist_design_system() result
 
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
-    
-    # Persist to files if requested
+    generator = get_generator() if executor is None else DesignSystemGenerator(executor)
+    try:
+        # Persist to files if requested
+        if persist:
+            result = persist_design_system(generator.generate(query, project_name), page, output_dir, query)
+            if persisted is not None:
+                persisted.update(result)
+
+        return generator.render(query, project_name, "markdown" if output_format == "markdown" else "ascii")
+    finally:
+        if executor is not None:
+            generator.close()
+
+
+# ============ BULK GENERATION ============
+def _init_generate_worker():
+    """Process pool initializer: load reasoning rules once per worker."""
+    get_generator()
+
+
+def _generate_task(task: tuple) -> dict:
+    """Generate (and optionally persist) one design system inside a worker."""
+    query, project_name, persist, page, output_dir = task
+    design_system = get_generator().generate(query, project_name)
     if persist:
         persist_design_system(design_system, page, output_dir, query)
+    return design_system
+
+
+def prepare_shared_indexes():
+    """Compile index files and load them in this process before starting workers.
+
+    Forked workers inherit the loaded, mmap'd indexes; spawned workers map
+    the same compiled files instead of rebuilding them.
+    """
+    build_indexes()
+    preload_indexes(stacks=[])
+
 
-    if output_format == "markdown":
-        return format_markdown(design_system)
-    return format_ascii_box(design_system)
+def generate_many(queries: list, workers: int = None, project_names: list = None,
+                  persist: bool = False, page: str = None, output_dir: str = None) -> list:
+    """
+    Generate design systems for many briefs across a process pool.
+
+    Args:
+        queries: Briefs to generate for (e.g., ["SaaS dashboard", "fintech app"])
+        workers: Pool size (defaults to the CPU count); 1 runs in-process
+        project_names: Optional project name per query
+        persist: If True, persist each design system (see persist_design_system)
+        page: Optional page override file to create for every project
+        output_dir: Optional output directory for persisted files
+
+    Returns:
+        List of design system dicts, in the order of queries
+    """
+    names = project_names or [None] * len(queries)
+    if len(names) != len(queries):
+        raise ValueError("project_names must have one entry per query")
+    tasks = [(query, name, persist, page, output_dir) for query, name in zip(queries, names)]
+
+    prepare_shared_indexes()
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        _init_generate_worker()
+        return [_generate_task(task) for task in tasks]
+
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_generate_worker) as pool:
+        return list(pool.map(_generate_task, tasks, chunksize=chunksize))
 
 
 # ============ PERSISTENCE FUNCTIONS ============
+def _content_digest(content: str) -> bytes:
+    """Hash of persisted file content, excluding its generation timestamp."""
+    return hashlib.sha256(GENERATED_LINE.sub(r"\1**Generated:**", content).encode("utf-8")).digest()
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Atomically replace path with content unless only the timestamp would change.
+
+    Returns True if the file was written, False if it was left untouched.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if _content_digest(f.read()) == _content_digest(content):
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    # Write beside the target and rename over it so readers never see a partial file
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_file, path)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+        raise
+    return True
+
+
+@profile_stage("persist")
 def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
@@ -498,8 +802,12 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
     
+    Files are replaced atomically, and files whose content is unchanged apart
+    from the generation timestamp are not rewritten.
+
     Returns:
-        dict with created file paths and status
+        dict with status, all file paths ("created_files"), and which of them
+        were rewritten ("written_files") or already up to date ("skipped_files")
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
@@ -511,31 +819,31 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     pages_dir = design_system_dir / "pages"
     
     created_files = []
+    written_files = []
+    skipped_files = []
     
     # Create directories
     design_system_dir.mkdir(parents=True, exist_ok=True)
     pages_dir.mkdir(parents=True, exist_ok=True)
     
-    master_file = design_system_dir / "MASTER.md"
-    
-    # Generate and write MASTER.md
-    master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
-    created_files.append(str(master_file))
-    
-    # If page is specified, create page override file with intelligent content
+    # MASTER.md, plus a page override file with intelligent content if page is specified
+    files = [(design_system_dir / "MASTER.md", format_master_md(design_system))]
     if page:
         page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+        files.append((page_file, format_page_override_md(design_system, page, page_query)))
+
+    for path, content in files:
+        created_files.append(str(path))
+        (written_files if _write_if_changed(path, content) else skipped_files).append(str(path))
+    profile_count("persist_writes", len(written_files))
+    profile_count("persist_skips", len(skipped_files))
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files,
+        "written_files": written_files,
+        "skipped_files": skipped_files
     }
 
 
@@ -955,11 +1263,12 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
         effects = style.get("Effects & Animation", "")
         
         # Infer layout from style keywords
-        if any(kw in keywords.lower() for kw in ["data", "dense", "dashboard", "grid"]):
+        density = next(iter(_LAYOUT_DENSITY_MATCHER.match(keywords)), None)
+        if density == "dense":
             layout["Max Width"] = "1400px or full-width"
             layout["Grid"] = "12-column grid for data flexibility"
             spacing["Content Density"] = "High — optimize for information display"
-        elif any(kw in keywords.lower() for kw in ["minimal", "simple", "clean", "single"]):
+        elif density == "minimal":
             layout["Max Width"] = "800px (narrow, focused)"
             layout["Layout"] = "Single column, centered"
             spacing["Content Density"] = "Low — focus on clarity"
@@ -1019,36 +1328,15 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
 
 def _detect_page_type(context: str, style_results: list) -> str:
     """Detect page type from context and search results."""
-    context_lower = context.lower()
-    
-    # Check for common page type patterns
-    page_patterns = [
-        (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
-        (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
-        (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
-        (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
-        (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
-        (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
-        (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
-        (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
-        (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
-        (["empty", "404", "error", "not found", "zero"], "Empty State"),
-    ]
-    
-    for keywords, page_type in page_patterns:
-        if any(kw in context_lower for kw in keywords):
-            return page_type
-    
+    # First PAGE_TYPE_KEYWORDS entry with a keyword in the context
+    for page_type in _PAGE_TYPE_MATCHER.match(context):
+        return page_type
+
     # Fallback: try to infer from style results
     if style_results:
-        style_name = style_results[0].get("Style Category", "").lower()
-        best_for = style_results[0].get("Best For", "").lower()
-        
-        if "dashboard" in best_for or "data" in best_for:
-            return "Dashboard / Data View"
-        elif "landing" in best_for or "marketing" in best_for:
-            return "Landing / Marketing"
-    
+        for page_type in _STYLE_PAGE_TYPE_MATCHER.match(style_results[0].get("Best For", "")):
+            return page_type
+
     return "General"
 
 
@@ -5,6 +5,12 @@ UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py --serve [--socket /tmp/uipro.sock] [--watch 1.0]
+       python search.py --batch requests.jsonl [--design-system | --stack <stack> | --domain <domain>] [--workers 8]
+       python search.py --build-index
+       python search.py "<query>" [--json] --profile
+       python search.py "<query>" --domain ux -n 5 --cursor [<cursor>]
+       python search.py "<query>" --domain style --boost "Style Category=3" --boost Keywords=2
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
 Stacks: html-tailwind, react, nextjs
@@ -12,13 +18,40 @@ Stacks: html-tailwind, react, nextjs
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+               Files are replaced atomically; files unchanged apart from their timestamp are not rewritten
+
+Server mode (indexes stay loaded between queries, see server.py / client.py):
+  --serve      Answer newline-delimited JSON requests on stdin/stdout
+  --socket     Listen on a Unix domain socket instead of stdin/stdout
+  --watch      Seconds between checks for edited CSVs while serving (0 disables)
+  --batch      Run a JSONL file of requests ("-" for stdin) and stream JSONL results;
+               plain text lines are treated as queries using the other CLI flags as defaults
+  --workers    Run --batch requests across a process pool (e.g. bulk --design-system regeneration)
+
+Indexes are compiled to .index_cache/ on first use and refitted incrementally
+(only added/edited rows are re-tokenized) whenever a CSV changes;
+  --build-index  Recompile the binary indexes for every file in data/ and data/stacks/ from scratch
+
+Paging:
+  --cursor     Return one page of -n results plus a cursor for the next page; pass that
+               cursor back to continue (a --serve process continues without rescoring)
+
+Field boosts:
+  --boost      FIELD=WEIGHT multiplier for one search column (repeatable); ranks with
+               field-weighted BM25F, e.g. to prefer matches in style names over descriptions
+
+Profiling:
+  --profile    Record per-stage timings, cache hits and corpus sizes; added as "stats"
+               to --json output, otherwise printed to stderr
 """
 
 import argparse
+import os
 import sys
 import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+from contextlib import nullcontext
+from core import (CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, build_indexes, profile_stage, profiling, search, search_page,
+                  search_stack)
 
 # Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
 if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
@@ -41,7 +74,7 @@ def format_output(result):
         output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
     output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
 
-    for i, row in enumerate(result['results'], 1):
+    for i, row in enumerate(result['results'], result.get('offset', 0) + 1):
         output.append(f"### Result {i}")
         for key, value in row.items():
             value_str = str(value)
@@ -50,12 +83,42 @@ def format_output(result):
             output.append(f"- **{key}:** {value_str}")
         output.append("")
 
+    if result.get("cursor"):
+        output.append(f"**Next page:** --cursor {result['cursor']}")
     return "\n".join(output)
 
 
+def format_stats(stats):
+    """Format --profile stats as a short timing summary"""
+    data = stats.as_dict()
+    output = [f"## Profile: {data['total_ms']:.3f} ms total"]
+    for stage, ms in sorted(data["stages_ms"].items(), key=lambda item: -item[1]):
+        output.append(f"- {stage:<14} {ms:>10.3f} ms")
+    if data["counters"]:
+        output.append("- counters: " + ", ".join(f"{name}={count}" for name, count in sorted(data["counters"].items())))
+    if data["corpus"]:
+        output.append("- corpus: " + ", ".join(f"{file}={docs}" for file, docs in sorted(data["corpus"].items())))
+    return "\n".join(output)
+
+
+def print_result(result, as_json=False, stats=None):
+    """Print a search result; with --profile stats, JSON gains a "stats" field and text a summary on stderr"""
+    if as_json:
+        import json
+        if stats is not None:
+            result = {**result, "stats": stats.as_dict()}
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return
+    with profile_stage("format"):
+        output = format_output(result)
+    print(output)
+    if stats is not None:
+        print(format_stats(stats), file=sys.stderr)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
@@ -64,51 +127,111 @@ if __name__ == "__main__":
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
     parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
+    parser.add_argument("--executor", choices=["thread", "process"], default=None, help="Run design system domain searches in a thread/process pool")
     # Persistence (Master + Overrides pattern)
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Server mode
+    parser.add_argument("--serve", action="store_true", help="Keep indexes loaded and answer JSON-lines requests (stdin/stdout or --socket)")
+    parser.add_argument("--socket", type=str, default=None, help="Unix domain socket path for --serve")
+    parser.add_argument("--watch", type=float, default=1.0, metavar="SECONDS", help="With --serve, reload edited CSVs every SECONDS (0 disables, default: 1)")
+    # Batch mode
+    parser.add_argument("--batch", type=str, default=None, metavar="FILE", help="Run JSONL requests from FILE ('-' for stdin), streaming JSONL results")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Process pool size for --batch (default: 1, in-process)")
+    # Index maintenance
+    parser.add_argument("--build-index", action="store_true", help="Recompile binary indexes for all data/ and data/stacks/ CSVs")
+    # Instrumentation
+    parser.add_argument("--profile", action="store_true", help="Report per-stage timings (JSON 'stats' field with --json, else stderr)")
+    parser.add_argument("--boost", action="append", default=[], metavar="FIELD=WEIGHT", help="Weight matches in a search column (repeatable, domain searches)")
+    # Paging
+    parser.add_argument("--cursor", nargs="?", const="", default=None, help="Page through results: no value for the first page, then the printed cursor")
 
     args = parser.parse_args()
+    if not (args.serve or args.batch or args.build_index) and args.query is None:
+        parser.error("the following arguments are required: query")
+    if args.cursor is not None and (args.stack or args.design_system):
+        parser.error("--cursor only applies to domain searches")
+    if args.batch and args.batch != "-" and not os.path.isfile(args.batch):
+        parser.error(f"--batch file not found: {args.batch}")
+    boosts = {}
+    for boost in args.boost:
+        field, _, weight = boost.rpartition("=")
+        try:
+            boosts[field.strip()] = float(weight)
+        except ValueError:
+            parser.error(f"--boost expects FIELD=WEIGHT, got {boost!r}")
+    profile = profiling() if args.profile else nullcontext()
 
+    if args.build_index:
+        status = build_indexes(rebuild=True)
+        for file, state in status.items():
+            print(f"{state:>6}  {file}")
+        print(f"Compiled {len(status)} indexes")
+    # Server mode keeps running until EOF / interrupt
+    elif args.serve:
+        from server import serve
+        serve(args.socket, args.watch)
+    # Batch mode: CLI flags become per-request defaults
+    elif args.batch:
+        from server import run_batch
+        defaults = {"max_results": args.max_results}
+        if args.design_system:
+            defaults.update({"type": "design_system", "format": args.format, "project_name": args.project_name,
+                             "persist": args.persist, "page": args.page, "output_dir": args.output_dir})
+        elif args.stack:
+            defaults.update({"type": "stack", "stack": args.stack})
+        else:
+            defaults.update({"type": "search", "domain": args.domain})
+        failures = run_batch(args.batch, defaults, workers=args.workers)
+        sys.exit(1 if failures else 0)
     # Design system takes priority
-    if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
-            persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
-        )
+    elif args.design_system:
+        from design_system import generate_design_system
+        persisted = {}
+        with profile as stats:
+            result = generate_design_system(
+                args.query, 
+                args.project_name, 
+                args.format,
+                persist=args.persist,
+                page=args.page,
+                output_dir=args.output_dir,
+                executor=args.executor,
+                persisted=persisted
+            )
         print(result)
+        if stats is not None:
+            print(format_stats(stats), file=sys.stderr)
         
         # Print persistence confirmation
-        if args.persist:
-            project_slug = args.project_name.lower().replace(' ', '-') if args.project_name else "default"
+        if persisted:
+            project_slug = os.path.basename(persisted["design_system_dir"])
+            skipped = set(persisted["skipped_files"])
             print("\n" + "=" * 60)
-            print(f"✅ Design system persisted to design-system/{project_slug}/")
-            print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
-            if args.page:
+            print(f"✅ Design system persisted to design-system/{project_slug}/ "
+                  f"({len(persisted['written_files'])} written, {len(skipped)} unchanged)")
+            master_file, *page_files = persisted["created_files"]
+            unchanged = lambda path: ", unchanged" if path in skipped else ""
+            print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth{unchanged(master_file)})")
+            if page_files:
                 page_filename = args.page.lower().replace(' ', '-')
-                print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
+                print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides{unchanged(page_files[0])})")
             print("")
             print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
             print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
             print("=" * 60)
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
-    # Domain search
+        with profile as stats:
+            result = search_stack(args.query, args.stack, args.max_results)
+            print_result(result, args.json, stats)
+    # Domain search, optionally one page at a time
+    elif args.cursor is not None:
+        with profile as stats:
+            result = search_page(args.query, args.domain, args.max_results, args.cursor, boosts or None)
+            print_result(result, args.json, stats)
     else:
-        result = search(args.query, args.domain, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
+        with profile as stats:
+            result = search(args.query, args.domain, args.max_results, boosts or None)
+            print_result(result, args.json, stats)
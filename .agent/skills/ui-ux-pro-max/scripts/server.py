@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Server - keeps search indexes hot and answers
+newline-delimited JSON requests over stdin/stdout or a Unix domain socket,
+or runs a whole JSONL batch file in one process.
+
+Usage: python search.py --serve                       (stdin/stdout)
+       python search.py --serve --socket /tmp/uipro.sock [--watch 0.5]
+       python client.py "<query>" --socket /tmp/uipro.sock [--domain <domain>]
+       python search.py --batch requests.jsonl [--design-system] [--domain <domain>] [--workers 8]
+
+Request (one JSON object per line):
+    {"id": 1, "type": "search", "query": "saas dashboard", "domain": "style", "max_results": 3}
+    {"id": 2, "type": "stack", "query": "forms", "stack": "react"}
+    {"id": 3, "type": "design_system", "query": "fintech", "project_name": "Acme", "format": "markdown"}
+    {"id": 4, "type": "ping"}
+    {"id": 5, "type": "stats"}                        query / design system cache counters
+    {"id": 6, "type": "search", "query": "forms", "domain": "ux", "cursor": null}
+                                                      one page of max_results; pass the returned
+                                                      result "cursor" back for the next page
+    {"id": 7, "type": "search", "query": "dark", "domain": "style", "boosts": {"Style Category": 3}}
+                                                      BM25F ranking with per-column weights
+
+Response (one JSON object per line, "id" echoed back):
+    {"id": 1, "result": {...}}                        search / stack
+    {"id": 3, "result": {...}, "output": "..."}       design_system
+    {"id": 4, "error": "..."}                         on failure
+Search requests may pass "format": "text" to also receive the CLI rendering in "output",
+and any request may pass "profile": true to receive per-stage timings in "stats".
+
+While serving, the data CSVs are polled every WATCH_INTERVAL seconds and
+edited files are refitted incrementally, so edits are searchable without a restart.
+"""
+
+import json
+import os
+import select
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from core import (CSV_CONFIG, MAX_RESULTS, preload_indexes, profiling, query_cache, refresh_indexes,
+                  search, search_many, search_page, search_stack)
+from design_system import get_generator, persist_design_system, prepare_shared_indexes
+
+
+WATCH_INTERVAL = 1.0  # Seconds between data CSV checks while serving
+BATCH_CHUNK_SIZE = 1024  # Most buffered batch lines whose search requests are scored together
+
+
+# ============ REQUEST HANDLING ============
+def _format_text(result: dict) -> str:
+    """Render a search result the same way the one-shot CLI does."""
+    from search import format_output
+    return format_output(result)
+
+
+def handle_request(request: dict, prescored: dict = None) -> dict:
+    """Execute a single request dict and return the response dict.
+
+    prescored: the search() result of a plain search request, already
+    computed for it (see _batch_searches()).
+    """
+    if not isinstance(request, dict):
+        return {"id": None, "error": "Request must be a JSON object"}
+
+    response = {"id": request.get("id")}
+    kind = request.get("type", "search")
+    query = request.get("query")
+    max_results = request.get("max_results", MAX_RESULTS)
+
+    if kind == "ping":
+        response["result"] = "pong"
+        return response
+    if kind == "stats":
+        response["result"] = {"query_cache": query_cache.stats(), "design_system_cache": get_generator().cache_stats()}
+        return response
+    if not isinstance(query, str) or not query.strip():
+        response["error"] = "Missing 'query'"
+        return response
+    if kind in ("search", "stack") and (isinstance(max_results, bool) or not isinstance(max_results, int)
+                                        or max_results < 1):
+        response["error"] = "'max_results' must be a positive integer"
+        return response
+
+    if kind == "search":
+        domain = request.get("domain")
+        if domain is not None and domain not in CSV_CONFIG:
+            response["error"] = f"Unknown domain: {domain}. Available: {', '.join(CSV_CONFIG)}"
+            return response
+        boosts = request.get("boosts")
+        if boosts is not None and not (isinstance(boosts, dict)
+                                       and all(isinstance(weight, (int, float)) and not isinstance(weight, bool)
+                                               for weight in boosts.values())):
+            response["error"] = "'boosts' must map search columns to numbers"
+            return response
+        if "cursor" in request:
+            result = search_page(query, domain, max_results, request["cursor"], boosts)
+        elif prescored is not None:
+            result = prescored
+        else:
+            result = search(query, domain, max_results, boosts)
+    elif kind == "stack":
+        result = search_stack(query, request.get("stack"), max_results)
+    elif kind == "design_system":
+        generator = get_generator()
+        project_name = request.get("project_name")
+        design_system = generator.generate(query, project_name)
+        if request.get("persist"):
+            response["persisted"] = persist_design_system(design_system, request.get("page"), request.get("output_dir"), query)
+        response["result"] = design_system
+        output_format = "markdown" if request.get("format") == "markdown" else "ascii"
+        response["output"] = generator.render(query, project_name, output_format)
+        return response
+    else:
+        response["error"] = f"Unknown request type: {kind}"
+        return response
+
+    if "error" in result:
+        response["error"] = result["error"]
+        return response
+    response["result"] = result
+    if request.get("format") == "text":
+        response["output"] = _format_text(result)
+    return response
+
+
+def _execute(request, prescored: dict = None) -> dict:
+    """handle_request() that reports unexpected exceptions as error responses."""
+    try:
+        if isinstance(request, dict) and request.get("profile"):
+            with profiling() as stats:
+                response = handle_request(request, prescored)
+            response["stats"] = stats.as_dict()
+            return response
+        return handle_request(request, prescored)
+    except Exception as e:
+        request_id = request.get("id") if isinstance(request, dict) else None
+        return {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+
+
+def handle_line(line: str) -> str:
+    """Decode one request line and return the encoded response line."""
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        response = {"id": None, "error": f"Invalid JSON: {e}"}
+    else:
+        response = _execute(request)
+    return json.dumps(response, ensure_ascii=False)
+
+
+# ============ TRANSPORTS ============
+def serve_stream(infile=None, outfile=None):
+    """Answer requests line by line until EOF (stdin/stdout by default)."""
+    infile = infile or sys.stdin
+    outfile = outfile or sys.stdout
+    for line in infile:
+        if not line.strip():
+            continue
+        outfile.write(handle_line(line) + "\n")
+        outfile.flush()
+
+
+def _read_batch(infile, defaults: dict):
+    """Yield (request, None) for each batch line, or (None, error response) if unparseable."""
+    for line_no, line in enumerate(infile, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if not line.startswith("{"):
+            yield {"id": line_no, **defaults, "query": line}, None
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield None, {"id": line_no, "error": f"Invalid JSON: {e}"}
+            continue
+        if isinstance(request, dict):
+            request = {"id": line_no, **defaults, **request}
+        yield request, None
+
+
+def _input_ready(infile) -> bool:
+    """Whether more of infile can be read without waiting on its writer."""
+    try:
+        fd = infile.fileno()
+    except (AttributeError, OSError):
+        return True  # In-memory streams
+    try:
+        if stat.S_ISREG(os.fstat(fd).st_mode):
+            return True
+        return bool(select.select([fd], [], [], 0)[0])
+    except (OSError, ValueError):
+        return False
+
+
+def _read_chunk(entries, infile) -> list:
+    """Next batch entry plus up to BATCH_CHUNK_SIZE - 1 more that are readable without blocking."""
+    chunk = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= BATCH_CHUNK_SIZE or not _input_ready(infile):
+            break
+    return chunk
+
+
+def _batch_searches(requests: list) -> dict:
+    """search_many() results for the plain search requests in requests, keyed by position.
+
+    Requests are grouped by domain and max_results so each group is scored
+    as one batch. Paged, boosted and profiled searches, and requests that
+    handle_request() would reject, are left to run on their own.
+    """
+    groups = defaultdict(list)
+    for pos, request in enumerate(requests):
+        if (not isinstance(request, dict) or request.get("type", "search") != "search" or "cursor" in request
+                or request.get("boosts") is not None or request.get("profile")):
+            continue
+        query = request.get("query")
+        domain = request.get("domain")
+        max_results = request.get("max_results", MAX_RESULTS)
+        if (isinstance(query, str) and query.strip() and (domain is None or domain in CSV_CONFIG)
+                and isinstance(max_results, int) and not isinstance(max_results, bool) and max_results >= 1):
+            groups[(domain, max_results)].append(pos)
+
+    results = {}
+    for (domain, max_results), positions in groups.items():
+        try:
+            responses = search_many([requests[pos]["query"] for pos in positions], domain, max_results)
+        except Exception:
+            continue  # Each request runs alone and reports its own error
+        results.update(zip(positions, responses))
+    return results
+
+
+def _init_batch_worker():
+    """Process pool initializer for parallel batches."""
+    get_generator()
+
+
+def run_batch(path: str, defaults: dict = None, outfile=None, workers: int = 1) -> int:
+    """Run every request in a JSONL file ("-" for stdin), streaming one response line each.
+
+    Lines that are not JSON objects are treated as bare queries. Keys in
+    defaults (e.g. {"type": "design_system"}) apply unless a line overrides
+    them. Indexes load lazily and are reused across the whole batch. The
+    plain search requests among the lines already readable without blocking
+    (at most BATCH_CHUNK_SIZE) are scored together with search_many(). With
+    workers > 1, the other requests run in a process pool sharing the
+    compiled indexes. Responses are written in input order as soon as they
+    are ready.
+    Returns the number of failed requests.
+    """
+    defaults = defaults or {}
+    outfile = outfile or sys.stdout
+    failures = 0
+    pending = deque()  # Responses (or pool futures) not yet written, in input order
+    infile = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    pool = None
+
+    def write_ready(wait: bool = False):
+        nonlocal failures
+        while pending and (wait or not isinstance(pending[0], Future) or pending[0].done()):
+            response = pending.popleft()
+            if isinstance(response, Future):
+                response = response.result()
+            if "error" in response:
+                failures += 1
+            outfile.write(json.dumps(response, ensure_ascii=False) + "\n")
+            outfile.flush()
+
+    try:
+        if workers > 1:
+            prepare_shared_indexes()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker)
+
+        entries = _read_batch(infile, defaults)
+        while True:
+            if not _input_ready(infile):
+                write_ready(wait=True)  # Don't hold finished responses while waiting for input
+            chunk = _read_chunk(entries, infile)
+            if not chunk:
+                break
+            prescored = _batch_searches([request for request, _ in chunk])
+            for pos, (request, error) in enumerate(chunk):
+                if request is None:
+                    pending.append(error)
+                elif pos in prescored:
+                    pending.append(_execute(request, prescored[pos]))
+                elif pool is not None:
+                    pending.append(pool.submit(_execute, request))
+                else:
+                    pending.append(_execute(request))
+                write_ready()
+        write_ready(wait=True)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if infile is not sys.stdin:
+            infile.close()
+    return failures
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One client connection: any number of request lines."""
+
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode("utf-8", errors="replace")
+            if not line.strip():
+                continue
+            self.wfile.write((handle_line(line) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def _remove_stale_socket(socket_path: str):
+    """Delete a socket file left behind by a server that is no longer running.
+
+    Raises RuntimeError if the path is not a socket or a server still answers on it.
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket; refusing to replace it")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"Another server is already listening on {socket_path}")
+
+
+def serve_unix(socket_path: str):
+    """Serve requests on a Unix domain socket until interrupted."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix domain sockets are not supported on this platform; use stdin/stdout mode")
+    _remove_stale_socket(socket_path)
+    server = socketserver.ThreadingUnixStreamServer(socket_path, _RequestHandler)
+    server.daemon_threads = True
+    if threading.current_thread() is threading.main_thread():
+        # Exit through the finally block on `kill` so the socket file is removed
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"UI Pro Max server listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def _watch_data(interval: float):
+    """Poll the loaded CSVs and refit indexes of edited ones (daemon thread body)."""
+    while True:
+        time.sleep(interval)
+        try:
+            refreshed = refresh_indexes()
+        except Exception as e:
+            print(f"Index refresh failed: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+        for path in refreshed:
+            print(f"Reloaded index for {path}", file=sys.stderr)
+
+
+def serve(socket_path: str = None, watch: float = WATCH_INTERVAL):
+    """Warm every index, then serve over a socket or stdin/stdout.
+
+    watch: seconds between checks for edited CSVs (0 or None disables the watcher).
+    """
+    preload_indexes()
+    get_generator()
+    if watch:
+        threading.Thread(target=_watch_data, args=(watch,), name="uipro-watch", daemon=True).start()
+    if socket_path:
+        serve_unix(socket_path)
+    else:
+        serve_stream()